@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+from shared_graph import attach_graph, share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report connectivity and degrees-of-separation statistics for a dataset, as JSON."
+    )
+    parser.add_argument("directory", nargs="?", default="large", help="dataset directory (default: large)")
+    parser.add_argument("--sample", type=int, default=100,
+                        help="number of random sources for the separation distribution (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the sample (default: 0)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of processes searching from sampled sources (default: one per CPU)")
+    parser.add_argument("--around", nargs="+", metavar="NAME",
+                        help="also report how many people are within each number of degrees of any of these people")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    print("Data loaded.", file=sys.stderr)
+    graph = degrees.graph
+
+    report = {"people": len(graph.person_ids), "components": component_summary(graph)}
+
+    rng = random.Random(args.seed)
+    sources = rng.sample(range(len(graph.person_ids)), min(args.sample, len(graph.person_ids)))
+    report["separation"] = separation_summary(graph, sources, args.workers)
+
+    if args.around:
+        around = []
+        for name in args.around:
+            person_ids = degrees.person_ids_for_name(name)
+            if not person_ids:
+                sys.exit(f"Person not found: {name}")
+            around.append(graph.person_index[person_ids[0]])
+        counts = level_sizes(graph, around)
+        report["around"] = {
+            "names": args.around,
+            "within": cumulative_fractions(counts, len(graph.person_ids)),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+def bfs_levels(graph, sources, seen_people=None, seen_movies=None):
+    """
+    Multi-source breadth-first search: yields the list of people at distance 0 (the <sources>), 1, 2, ...
+    from the nearest source, until everyone reachable has been yielded.
+
+    Every movie is expanded at most once, so the whole search is linear in the size of the graph. People and
+    movies already marked in <seen_people> and <seen_movies> (bytearrays, updated in place) are skipped; by
+    default the search starts with fresh ones.
+    """
+    if seen_people is None:
+        seen_people = bytearray(len(graph.person_ids))
+    if seen_movies is None:
+        seen_movies = bytearray(len(graph.movie_ids))
+    level = []
+    for person in sources:
+        if not seen_people[person]:
+            seen_people[person] = 1
+            level.append(person)
+
+    while level:
+        yield level
+        next_level = []
+        for person in level:
+            for movie in graph.movies_for(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in graph.stars_for(movie):
+                    if not seen_people[star]:
+                        seen_people[star] = 1
+                        next_level.append(star)
+        level = next_level
+
+
+def level_sizes(graph, sources) -> list[int]:
+    """
+    Returns how many people are at each distance from the nearest of <sources>.
+    """
+    return [len(level) for level in bfs_levels(graph, sources)]
+
+
+def components(graph) -> list[tuple[int, int]]:
+    """
+    Returns (size, one member) for every connected component of people, largest first.
+
+    All the searches share one pair of seen arrays: a component's people and movies are never reached from
+    another, so the whole sweep stays linear in the size of the graph.
+    """
+    seen_people = bytearray(len(graph.person_ids))
+    seen_movies = bytearray(len(graph.movie_ids))
+    found = []
+    for person in range(len(graph.person_ids)):
+        if seen_people[person]:
+            continue
+        size = sum(len(level) for level in bfs_levels(graph, [person], seen_people, seen_movies))
+        found.append((size, person))
+
+    found.sort(reverse=True)
+    return found
+
+
+def component_summary(graph) -> dict:
+    """
+    Summarizes the connected components, with a double-sweep lower bound on the diameter of the largest:
+    search from any member to a farthest person, then from that person, and take the farther distance.
+    """
+    found = components(graph)
+    if not found:
+        return {"count": 0}
+
+    largest_size, member = found[0]
+    sweep = list(bfs_levels(graph, [member]))
+    farthest = sweep[-1][0]
+    diameter_bound = max(len(sweep), len(list(bfs_levels(graph, [farthest])))) - 1
+
+    return {
+        "count": len(found),
+        "largest": largest_size,
+        "largest_fraction": largest_size / len(graph.person_ids),
+        "isolated": sum(1 for size, _ in found if size == 1),
+        "largest_diameter_at_least": diameter_bound,
+    }
+
+
+def separation_summary(graph, sources, workers) -> dict:
+    """
+    Runs a breadth-first search from every person in <sources>, spread over <workers> processes sharing the
+    graph, and summarizes the distances found and the eccentricity of each source within its component.
+    """
+    if workers == 1 or len(sources) < 2:
+        all_counts = [level_sizes(graph, [source]) for source in sources]
+    else:
+        segment, lengths = share_graph(graph)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=attach_graph,
+                                     initargs=(segment.name, lengths, graph.person_ids, graph.movie_ids)) as pool:
+                all_counts = list(pool.map(source_level_sizes, sources, chunksize=max(1, len(sources) // 64)))
+        finally:
+            segment.close()
+            segment.unlink()
+
+    distribution = []
+    for counts in all_counts:
+        for distance, count in enumerate(counts):
+            if distance == len(distribution):
+                distribution.append(0)
+            distribution[distance] += count
+    eccentricities = sorted(len(counts) - 1 for counts in all_counts)
+    pairs = sum(distribution[1:])
+
+    return {
+        "sources": len(sources),
+        "distribution": {distance: count for distance, count in enumerate(distribution) if distance > 0},
+        "mean": sum(distance * count for distance, count in enumerate(distribution)) / pairs if pairs else None,
+        "eccentricity": {
+            "min": eccentricities[0],
+            "median": eccentricities[len(eccentricities) // 2],
+            "max": eccentricities[-1],
+        } if eccentricities else None,
+    }
+
+
+def source_level_sizes(source) -> list[int]:
+    """
+    Worker task: level_sizes for a single source, against the shared graph.
+    """
+    return level_sizes(degrees.graph, [source])
+
+
+def cumulative_fractions(counts, total) -> dict[int, float]:
+    """
+    Turns per-distance <counts> into the fraction of all <total> people within each distance.
+    """
+    fractions = {}
+    within = 0
+    for distance, count in enumerate(counts):
+        within += count
+        fractions[distance] = within / total
+
+    return fractions
+
+
+if __name__ == "__main__":
+    main()
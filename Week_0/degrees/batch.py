@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+from collections import defaultdict
+from itertools import combinations
+
+import degrees
+
+# Marks a query that gives a person id instead of a name
+ID_PREFIX = "id:"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees-of-separation queries against one loaded dataset, as JSON lines."
+    )
+    parser.add_argument("directory", nargs="?", default="large", help="dataset directory (default: large)")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="file of tab-separated 'source<TAB>target' name pairs, or - for stdin (default); "
+                             "write id:<person_id> instead of a name to pick one of several people sharing it")
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="read one name per line and answer every pair of distinct names instead")
+    parser.add_argument("--output", default="-", help="file to write JSON lines to, or - for stdout (default)")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    queries = open(args.queries, encoding="utf-8") if args.queries != "-" else sys.stdin
+    with queries:
+        if args.all_pairs:
+            pairs = list(combinations(read_names(queries), 2))
+        else:
+            pairs = list(read_pairs(queries))
+
+    output = open(args.output, "w", encoding="utf-8") if args.output != "-" else sys.stdout
+    with output:
+        for answer in answer_queries(pairs):
+            output.write(json.dumps(answer) + "\n")
+
+
+def read_names(lines) -> list[str]:
+    """
+    Returns the distinct non-blank names in <lines>, in order.
+    """
+    return list(dict.fromkeys(line.strip() for line in lines if line.strip()))
+
+
+def read_pairs(lines):
+    """
+    Yields (source name, target name) pairs from tab-separated <lines>, skipping blank lines.
+    """
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        source, _, target = line.partition("\t")
+        yield source.strip(), target.strip()
+
+
+def resolve(name) -> tuple[None | str, None | dict]:
+    """
+    Returns (person_id, None) if <name> matches exactly one person, or (None, error) otherwise.
+    <name> can also be "id:<person_id>", for people who share their name with others.
+    """
+    if name.startswith(ID_PREFIX):
+        person_id = name[len(ID_PREFIX):].strip()
+        if person_id not in degrees.graph.person_index:
+            return None, {"error": "not found", "person_id": person_id}
+        return person_id, None
+
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 0:
+        return None, {"error": "not found", "name": name}
+    if len(person_ids) > 1:
+        return None, {"error": "ambiguous", "name": name, "candidates": person_ids}
+
+    return person_ids[0], None
+
+
+def answer_queries(pairs) -> list[dict]:
+    """
+    Answers every (source name, target name) pair in <pairs>, returning one result dict per pair in the same order.
+
+    Queries are grouped by source: a source with several targets gets a single breadth-first search tree that
+    serves all of them, and a source with one target uses the bidirectional search.
+    """
+    answers = [None] * len(pairs)
+    targets_by_source = defaultdict(list)
+    for i, (source_name, target_name) in enumerate(pairs):
+        source_id, error = resolve(source_name)
+        if error is None:
+            target_id, error = resolve(target_name)
+        if error is not None:
+            answers[i] = {"source": source_name, "target": target_name, **error}
+        else:
+            targets_by_source[source_id].append((i, target_id))
+
+    for source_id, targets in targets_by_source.items():
+        if len(targets) == 1:
+            i, target_id = targets[0]
+            answers[i] = describe(pairs[i], degrees.shortest_path(source_id, target_id, bidirectional=True))
+            continue
+
+        tree = degrees.search_tree(source_id, [target_id for _, target_id in targets])
+        for i, target_id in targets:
+            answers[i] = describe(pairs[i], degrees.path_in_tree(tree, target_id))
+
+    return answers
+
+
+def describe(pair, path) -> dict:
+    """
+    Returns the JSON-serializable result for a query <pair> whose shortest path is <path>.
+    """
+    source_name, target_name = pair
+    if path is None:
+        return {"source": source_name, "target": target_name, "degrees": None, "path": None}
+
+    return {
+        "source": source_name,
+        "target": target_name,
+        "degrees": len(path),
+        "path": [{"movie": degrees.movies[movie_id]["title"], "movie_id": movie_id,
+                  "person": degrees.people[person_id]["name"], "person_id": person_id}
+                 for movie_id, person_id in path],
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+
+import degrees
+
+
+class QueryCache:
+    """
+    Bounded cache in front of degrees.shortest_path.
+
+    Results are kept per (source_id, target_id) and evicted least recently used first. The hottest sources, those
+    queried at least <tree_after> times and at least <evict_factor> times as often as any source whose tree would be
+    evicted for them, also get their complete breadth-first search tree kept (up to <max_trees> of them, as
+    degrees.compact_search_tree arrays), so any later query from that source is answered by walking parent links.
+
+    <search> is called as search(source_id, target_id) on a miss, and defaults to the bidirectional search.
+    <build_tree> is called as build_tree(source_id) for a hot source, and defaults to degrees.compact_search_tree;
+    the server passes functions that run both in its worker pool. Counters for every kind of hit and miss are
+    kept in <stats>. Safe to share between threads.
+    """
+    def __init__(self, max_results=10000, max_trees=8, tree_after=3, evict_factor=2.0, search=None, build_tree=None):
+        self.max_results = max_results
+        self.max_trees = max_trees
+        self.tree_after = tree_after
+        self.evict_factor = evict_factor
+        self.search = search or self.bidirectional_search
+        self.build_tree = build_tree or degrees.compact_search_tree
+        self.results = OrderedDict()
+        self.trees = {}
+        self.source_counts = OrderedDict()
+        self.stats = {
+            "result_hits": 0,
+            "result_misses": 0,
+            "tree_hits": 0,
+            "trees_built": 0,
+            "searches": 0,
+        }
+        self.lock = threading.Lock()
+
+    def shortest_path(self, source_id, target_id) -> None | list[tuple]:
+        """
+        Same contract as degrees.shortest_path, answered from the cache where possible.
+        """
+        key = (source_id, target_id)
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                self.stats["result_hits"] += 1
+                return self.results[key]
+            self.stats["result_misses"] += 1
+
+            tree = self.trees.get(source_id)
+            if tree is not None:
+                self.stats["tree_hits"] += 1
+            count = self.count_source(source_id)
+            build_tree = tree is None and count >= self.tree_after and self.is_hotter(count)
+
+        # Searching happens outside the lock so one slow query doesn't hold up the others
+        if tree is None and build_tree:
+            tree = self.build_tree(source_id)
+        if tree is not None:
+            path = degrees.path_in_compact_tree(tree, target_id)
+        else:
+            path = self.search(source_id, target_id)
+
+        with self.lock:
+            if build_tree:
+                self.stats["trees_built"] += 1
+                self.keep_tree(source_id, tree)
+            elif tree is None:
+                self.stats["searches"] += 1
+            self.remember(self.results, key, path, self.max_results)
+
+        return path
+
+    @staticmethod
+    def bidirectional_search(source_id, target_id) -> None | list[tuple]:
+        """
+        The default <search>.
+        """
+        return degrees.shortest_path(source_id, target_id, bidirectional=True)
+
+    def is_hotter(self, count) -> bool:
+        """
+        Returns True if a source queried <count> times deserves a tree: either there is room for another tree,
+        or it has been queried evict_factor times as often as the coldest source that has one. The margin keeps
+        sources that are about as hot as each other from evicting each other's trees over and over.
+        """
+        if self.max_trees <= 0:
+            return False
+        if len(self.trees) < self.max_trees:
+            return True
+
+        coldest = min(self.source_counts.get(source_id, 0) for source_id in self.trees)
+        return count > coldest and count >= self.evict_factor * coldest
+
+    def keep_tree(self, source_id, tree):
+        """
+        Stores <tree> for <source_id>, evicting the trees of the least queried sources beyond max_trees.
+        """
+        self.trees[source_id] = tree
+        while len(self.trees) > self.max_trees:
+            coldest = min(self.trees, key=lambda kept_id: self.source_counts.get(kept_id, 0))
+            del self.trees[coldest]
+
+    def count_source(self, source_id) -> int:
+        """
+        Records one more query from <source_id> and returns how many have been seen. Only the most recently
+        queried sources are tracked, so the counts use bounded memory too.
+        """
+        count = self.source_counts.pop(source_id, 0) + 1
+        self.remember(self.source_counts, source_id, count, self.max_results)
+        return count
+
+    @staticmethod
+    def remember(entries, key, value, limit):
+        """
+        Stores <value> under <key> as the most recently used entry, evicting the least recently used
+        entries beyond <limit>.
+        """
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        """
+        Returns the fraction of queries answered without a search (from a stored result or tree).
+        """
+        total = self.stats["result_hits"] + self.stats["result_misses"]
+        if total == 0:
+            return 0.0
+
+        return (self.stats["result_hits"] + self.stats["tree_hits"]) / total
@@ -1,55 +1,116 @@
-import csv
 import sys
+from array import array
+from collections import deque
 
-from util import Node, QueueFrontier
+from graph import Graph
+from ingest import read_dataset
+from name_index import NameIndex, rank_people
+from snapshot import load_snapshot, save_snapshot
+from util import ExploredSet, IndexedQueueFrontier, Node
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+# Maps person_ids to a dictionary of: name, birth
 people = {}
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+# Maps movie_ids to a dictionary of: title, year
 movies = {}
 
+# Integer-indexed people/movies graph built from stars.csv (see graph.Graph)
+graph = None
 
-def load_data(directory):
+# Counts of rows loaded and dropped by the last load_data
+load_stats = {}
+
+# name_index.NameIndex over people, if load_data built or loaded one
+name_index = None
+
+
+def load_data(directory, use_snapshot=True, workers=None):
     """
     Load data from CSV files into memory.
+
+    If <use_snapshot> is True, a binary snapshot (see snapshot.py) next to the CSVs is used instead when it is
+    up to date, and is (re)written after reading the CSVs otherwise. Loading a snapshot replaces names, people
+    and movies with read-only mappings over it (see tables.py). The snapshot also holds a NameIndex, left in
+    name_index. Large CSVs are parsed by a pool of <workers> processes (see ingest.py).
+
+    Row counts, including rows dropped as malformed, duplicates or dangling references, are left in load_stats.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global graph, names, people, movies, name_index
+
+    if use_snapshot:
+        loaded = load_snapshot(directory)
+        if loaded is not None:
+            # Read-only views of the mapped file; nothing is copied until it is looked up
+            graph, people, movies, names, name_index, stats = loaded
+            load_stats.update(stats)
+            return
+
+    rows, malformed = read_dataset(directory, workers)
+    for person_id, name, birth in rows["people.csv"]:
+        add_person(person_id, name, birth)
+    for movie_id, title, year in rows["movies.csv"]:
+        movies[movie_id] = {
+            "title": title,
+            "year": year
+        }
+
+    # Link stars, counting (and skipping) rows that reference unknown people or movies
+    person_ids = list(people)
+    movie_ids = list(movies)
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    stars = set()
+    unknown_people = unknown_movies = 0
+    for person_id, movie_id in rows["stars.csv"]:
+        person = person_index.get(person_id)
+        movie = movie_index.get(movie_id)
+        if person is None:
+            unknown_people += 1
+        if movie is None:
+            unknown_movies += 1
+        if person is not None and movie is not None:
+            stars.add((person, movie))
+
+    load_stats.update({
+        "people": len(people),
+        "duplicate_people": len(rows["people.csv"]) - len(people),
+        "malformed_people": malformed["people.csv"],
+        "movies": len(movies),
+        "duplicate_movies": len(rows["movies.csv"]) - len(movies),
+        "malformed_movies": malformed["movies.csv"],
+        "stars": len(stars),
+        "dropped_stars": len(rows["stars.csv"]) - len(stars),
+        "malformed_stars": malformed["stars.csv"],
+        "stars_with_unknown_person": unknown_people,
+        "stars_with_unknown_movie": unknown_movies,
+    })
+    del rows
+
+    graph = Graph.build(person_ids, movie_ids, stars, person_index, movie_index)
+
+    if use_snapshot:
+        name_index = NameIndex.build(people, graph)
+        try:
+            save_snapshot(directory, graph, people, movies, name_index, load_stats)
+        except OSError:
+            pass
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person to the people and names dicts.
+    """
+    people[person_id] = {
+        "name": name,
+        "birth": birth
+    }
+    if name.lower() not in names:
+        names[name.lower()] = {person_id}
+    else:
+        names[name.lower()].add(person_id)
 
 
 def main():
@@ -61,6 +122,13 @@ def main():
     print("Loading data...")
     load_data(directory)
     print("Data loaded.")
+    malformed = {table: load_stats[f"malformed_{table}"] for table in ("people", "movies", "stars")}
+    if any(malformed.values()):
+        print("Skipped malformed rows: " + ", ".join(f"{count} {table}" for table, count in malformed.items()) + ".")
+    if load_stats["dropped_stars"]:
+        print(f"Skipped {load_stats['dropped_stars']} duplicate or dangling star rows "
+              f"({load_stats['stars_with_unknown_person']} with an unknown person, "
+              f"{load_stats['stars_with_unknown_movie']} with an unknown movie).")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -84,7 +152,7 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source_id, target_id) -> None | list[tuple]:
+def shortest_path(source_id, target_id, bidirectional=False) -> None | list[tuple]:
     """
     Returns the shortest list of (movie_id, person_id) pairs, where both entries are string ids of people,
     that connect the source to the target.
@@ -92,29 +160,212 @@ def shortest_path(source_id, target_id) -> None | list[tuple]:
     Can return any path of minimum length if there are multiple.
 
     If no possible path, returns None.
+
+    If <bidirectional> is True, the search grows from both ends at once (see bidirectional_shortest_path).
     """
-    stack = QueueFrontier()
-    head_node = Node(source_id, None, None)
-    stack.frontier.append(head_node)
-    explored = []
+    if bidirectional:
+        return bidirectional_shortest_path(source_id, target_id)
 
-    while not stack.empty():
-        node = stack.remove()
+    target = graph.person_index[target_id]
+    queue = IndexedQueueFrontier()
+    queue.add(Node(graph.person_index[source_id], None, None))
+    explored = ExploredSet()
 
-        if node.state == target_id:
-            return generate_solution(node)
+    while not queue.empty():
+        node = queue.remove()
 
-        explored.append(node)
-        for pair in neighbors_for_person(node.state):
-            action = pair[0]
-            state = pair[1]
-            node_in_explored = any(node.state == state for node in explored)
-            if not (node_in_explored or stack.contains_state(state)):
-                stack.add(Node(state, node, action))
+        if node.state == target:
+            return path_to_ids(generate_solution(node))
+
+        explored.add(node)
+        for action, state in graph.neighbors(node.state):
+            if not (explored.contains_state(state) or queue.contains_state(state)):
+                queue.add(Node(state, node, action))
 
     return None
 
 
+def bidirectional_shortest_path(source_id, target_id) -> None | list[tuple]:
+    """
+    Same contract as shortest_path, but runs a breadth-first search from both the source and the target, always
+    expanding one full level of whichever frontier is smaller, and stops once the two searches meet.
+    """
+    if source_id == target_id:
+        return []
+
+    source = graph.person_index[source_id]
+    target = graph.person_index[target_id]
+
+    # Each side maps a person to (parent person, movie linking them, depth from that side's root)
+    source_side = {source: (None, None, 0)}
+    target_side = {target: (None, None, 0)}
+    source_frontier = [source]
+    target_frontier = [target]
+
+    while source_frontier and target_frontier:
+        if len(source_frontier) <= len(target_frontier):
+            source_frontier, meeting = expand_level(source_frontier, source_side, target_side)
+        else:
+            target_frontier, meeting = expand_level(target_frontier, target_side, source_side)
+
+        if meeting is not None:
+            return path_to_ids(join_paths(meeting, source_side, target_side))
+
+    return None
+
+
+def expand_level(frontier, this_side, other_side) -> tuple[list, None | int]:
+    """
+    Expands every person in <frontier> by one step, recording parents in <this_side>.
+
+    Returns the next frontier and the person where the two searches meet on the shortest combined path (or None
+    if they don't meet on this level).
+    """
+    next_frontier = []
+    meeting = None
+    best_length = None
+    for person in frontier:
+        depth = this_side[person][2]
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in other_side:
+                length = depth + 1 + other_side[neighbor][2]
+                if best_length is None or length < best_length:
+                    if neighbor not in this_side:
+                        this_side[neighbor] = (person, movie, depth + 1)
+                    meeting = neighbor
+                    best_length = length
+            if neighbor not in this_side:
+                this_side[neighbor] = (person, movie, depth + 1)
+                next_frontier.append(neighbor)
+
+    return next_frontier, meeting
+
+
+def join_paths(meeting, source_side, target_side) -> list[tuple]:
+    """
+    Stitches the source-side and target-side parent links together at <meeting> into a single
+    (movie, person) path from the source to the target.
+    """
+    result = []
+    current = meeting
+    while source_side[current][0] is not None:
+        parent, movie, _ = source_side[current]
+        result.append((movie, current))
+        current = parent
+    result.reverse()
+
+    current = meeting
+    while target_side[current][0] is not None:
+        parent, movie, _ = target_side[current]
+        result.append((movie, parent))
+        current = parent
+
+    return result
+
+
+def search_tree(source_id, target_ids=None) -> dict[int, tuple]:
+    """
+    Runs a breadth-first search from <source_id> and returns its tree of parent links, mapping every integer
+    person reached to (parent person, movie linking them). The source maps to (None, None).
+
+    If <target_ids> is given, the search stops as soon as all of them have been reached, so the tree is only
+    complete for those targets.
+    """
+    source = graph.person_index[source_id]
+    remaining = None
+    if target_ids is not None:
+        remaining = {graph.person_index[target_id] for target_id in target_ids} - {source}
+
+    tree = {source: (None, None)}
+    frontier = deque([source])
+    while frontier and (remaining is None or remaining):
+        person = frontier.popleft()
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor not in tree:
+                tree[neighbor] = (person, movie)
+                frontier.append(neighbor)
+                if remaining is not None:
+                    remaining.discard(neighbor)
+
+    return tree
+
+
+def path_in_tree(tree, target_id) -> None | list[tuple]:
+    """
+    Returns the (movie_id, person_id) path from the root of a search_tree to <target_id>,
+    or None if the target isn't in the tree.
+    """
+    current = graph.person_index[target_id]
+    if current not in tree:
+        return None
+
+    result = []
+    while tree[current][0] is not None:
+        parent, movie = tree[current]
+        result.append((movie, current))
+        current = parent
+    result.reverse()
+
+    return path_to_ids(result)
+
+
+def compact_search_tree(source_id) -> tuple[array, array]:
+    """
+    Runs a complete breadth-first search from <source_id> and returns its tree as two arrays indexed by integer
+    person: the parent of everyone reached (the source is its own parent, and people not reached have -1), and
+    the movie linking them to it.
+
+    About 8 bytes per person however much of the graph is reached, so it suits trees kept for a long time, and
+    arrays pickle cheaply when the tree is built in another process. Every movie is expanded at most once.
+    """
+    source = graph.person_index[source_id]
+    parents = array("i", [-1]) * len(graph.person_ids)
+    links = array("i", [-1]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    parents[source] = source
+
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        for movie in graph.movies_for(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_for(movie):
+                if parents[star] == -1:
+                    parents[star] = person
+                    links[star] = movie
+                    frontier.append(star)
+
+    return parents, links
+
+
+def path_in_compact_tree(tree, target_id) -> None | list[tuple]:
+    """
+    Returns the (movie_id, person_id) path from the root of a compact_search_tree to <target_id>,
+    or None if the target wasn't reached.
+    """
+    parents, links = tree
+    current = graph.person_index[target_id]
+    if parents[current] == -1:
+        return None
+
+    result = []
+    while parents[current] != current:
+        result.append((links[current], current))
+        current = parents[current]
+    result.reverse()
+
+    return path_to_ids(result)
+
+
+def path_to_ids(path) -> list[tuple]:
+    """
+    Converts a path of integer (movie, person) pairs from the graph into string (movie_id, person_id) pairs.
+    """
+    return [(graph.movie_ids[movie], graph.person_ids[person]) for movie, person in path]
+
+
 def generate_solution(target_node) -> list[tuple]:
     result = []
     current_node = target_node
@@ -130,7 +381,7 @@ def person_id_for_name(name) -> str:
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -151,17 +402,20 @@ def person_id_for_name(name) -> str:
         return person_ids[0]
 
 
+def person_ids_for_name(name) -> list[str]:
+    """
+    Returns the IMDB ids of everyone with exactly this name (ignoring case), without prompting.
+    If there are several, the most likely intended person comes first (see name_index.rank_people).
+    """
+    return rank_people(names.get(name.lower(), set()), people, graph)
+
+
 def neighbors_for_person(person_id) -> set[tuple]:
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    return set(path_to_ids(graph.neighbors(graph.person_index[person_id])))
 
 
 if __name__ == "__main__":
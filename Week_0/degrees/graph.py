@@ -0,0 +1,95 @@
+from array import array
+
+
+class Graph:
+    """
+    Compact bipartite graph of people and movies.
+
+    People and movies are renumbered with dense integer ids (their position in <person_ids> / <movie_ids>), and the
+    star relation is stored twice in CSR form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the stars of movie m are
+    movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+
+    <person_index> and <movie_index> map string ids back to dense ids. If they aren't given, dicts are built the
+    first time they are used.
+    """
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self._person_index = person_index
+        self._movie_index = movie_index
+
+        # memoryview slices don't copy, so movies_for and stars_for are allocation-free
+        self.person_offsets = memoryview(person_offsets)
+        self.person_movies = memoryview(person_movies)
+        self.movie_offsets = memoryview(movie_offsets)
+        self.movie_people = memoryview(movie_people)
+
+    @property
+    def person_index(self):
+        if self._person_index is None:
+            self._person_index = {person_id: i for i, person_id in enumerate(self.person_ids)}
+        return self._person_index
+
+    @property
+    def movie_index(self):
+        if self._movie_index is None:
+            self._movie_index = {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+        return self._movie_index
+
+    @classmethod
+    def build(cls, person_ids, movie_ids, stars, person_index=None, movie_index=None):
+        """
+        Builds a graph from lists of string <person_ids> and <movie_ids> and an iterable of
+        (person_index, movie_index) pairs, where both entries are dense integer ids.
+        """
+        stars = list(stars)
+        person_offsets = cls._offsets(len(person_ids), (person for person, _ in stars))
+        movie_offsets = cls._offsets(len(movie_ids), (movie for _, movie in stars))
+
+        person_movies = array("i", bytes(4 * len(stars)))
+        movie_people = array("i", bytes(4 * len(stars)))
+        person_fill = array("i", person_offsets[:-1])
+        movie_fill = array("i", movie_offsets[:-1])
+        for person, movie in stars:
+            person_movies[person_fill[person]] = movie
+            person_fill[person] += 1
+            movie_people[movie_fill[movie]] = person
+            movie_fill[movie] += 1
+
+        return cls(person_ids, movie_ids, person_offsets, person_movies, movie_offsets, movie_people,
+                   person_index, movie_index)
+
+    @staticmethod
+    def _offsets(size, keys) -> array:
+        """
+        Returns the CSR offset array (of length <size> + 1) for the given sequence of row keys.
+        """
+        offsets = array("i", bytes(4 * (size + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+
+        return offsets
+
+    def movies_for(self, person) -> memoryview:
+        """
+        Returns the integer movie ids the integer person id <person> starred in.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_for(self, movie) -> memoryview:
+        """
+        Returns the integer person ids who starred in the integer movie id <movie>.
+        """
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) integer pairs for people who starred with <person>, including <person> themselves.
+        """
+        for movie in self.movies_for(person):
+            for star in self.stars_for(movie):
+                yield movie, star
@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Columns read from each file, in the order they appear in the returned tuples
+COLUMNS = {
+    "people.csv": ("id", "name", "birth"),
+    "movies.csv": ("id", "title", "year"),
+    "stars.csv": ("person_id", "movie_id"),
+}
+
+# Each worker task parses about this many bytes
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Below this total size the files are parsed in this process, as starting a pool would cost more than it saves
+PARALLEL_THRESHOLD = 2 * CHUNK_SIZE
+
+
+def read_dataset(directory, workers=None) -> tuple[dict[str, list[tuple]], dict[str, int]]:
+    """
+    Parses people.csv, movies.csv and stars.csv in <directory> into lists of tuples, one per row, with the fields
+    listed in COLUMNS. Returns those lists by filename, and the number of malformed rows (too short to hold every
+    column) dropped from each file.
+
+    Large datasets are split into line-aligned byte ranges which are parsed concurrently by a pool of <workers>
+    processes (default: one per CPU). This assumes no quoted field contains a newline, which holds for the IMDb
+    exports.
+    """
+    tasks = []
+    for filename, columns in COLUMNS.items():
+        path = os.path.join(directory, filename)
+        header, body_start = read_header(path)
+        try:
+            indices = tuple(header.index(column) for column in columns)
+        except ValueError:
+            raise Exception(f"{path} must have columns {', '.join(columns)}")
+        for start, end in chunks(path, body_start):
+            tasks.append((filename, path, start, end, indices))
+
+    total_size = sum(end - start for _, _, start, end, _ in tasks)
+    if workers == 1 or total_size < PARALLEL_THRESHOLD:
+        parsed = [parse_chunk(path, start, end, indices) for _, path, start, end, indices in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_chunk, *zip(*[task[1:] for task in tasks])))
+
+    rows = {filename: [] for filename in COLUMNS}
+    malformed = {filename: 0 for filename in COLUMNS}
+    for (filename, *_), (chunk_rows, chunk_malformed) in zip(tasks, parsed):
+        rows[filename].extend(chunk_rows)
+        malformed[filename] += chunk_malformed
+
+    return rows, malformed
+
+
+def read_header(path) -> tuple[list[str], int]:
+    """
+    Returns the column names in the first line of the CSV at <path>, and the byte offset where the rows start.
+    """
+    with open(path, "rb") as f:
+        line = f.readline()
+
+    return next(csv.reader([line.decode("utf-8-sig")])), len(line)
+
+
+def chunks(path, start) -> list[tuple[int, int]]:
+    """
+    Splits the bytes of <path> from <start> to the end into (start, end) ranges of roughly CHUNK_SIZE,
+    each ending just after a newline.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + CHUNK_SIZE, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def parse_chunk(path, start, end, indices) -> tuple[list[tuple], int]:
+    """
+    Parses the rows of <path> between byte offsets <start> and <end>, keeping the fields at <indices>.
+    Returns the rows, and how many short rows were skipped. Blank rows are skipped without being counted.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    needed = max(indices) + 1
+    reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+    rows = []
+    malformed = 0
+    for row in reader:
+        if len(row) >= needed:
+            rows.append(tuple(row[i] for i in indices))
+        elif row:
+            malformed += 1
+
+    return rows, malformed
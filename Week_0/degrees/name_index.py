@@ -0,0 +1,305 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from tables import StringTable
+
+# Fuzzy lookups count every query trigram found in at most 1 / RARE_TRIGRAM of all names
+RARE_TRIGRAM = 16
+
+# Roughly how many trigram postings can be counted in the time it takes to check one name's edit distance
+WINDOW_COST = 256
+
+
+class NameIndex:
+    """
+    Name lookups for autocomplete and typo-tolerant search, keyed on lowercased full names, over flat arrays that
+    snapshot.py can store and map back without rebuilding anything (see ARRAYS).
+
+    Every person has a rank: their position in the rank_people order of everyone, worked out once by build. The
+    people with each key are stored best first, and each key is ranked by its best person, so a lookup only ever
+    compares integers to order its results.
+
+    Prefix lookups binary search a sorted table of words, one entry for every word of every key as well as the
+    full key, so "han" finds "Tom Hanks". Fuzzy lookups gather candidates from the rarest of the query's trigrams
+    (or, for short queries, from every name about as long), filter them by length and shared trigrams, then check
+    them with a bounded edit distance. Results are person_ids
+    ordered by rank_people.
+    """
+    # Attributes holding the index: keys, words and trigram_table are StringTables, the rest int32 arrays
+    ARRAYS = ("keys", "key_offsets", "key_people", "key_rank", "key_lengths", "length_keys", "length_offsets",
+              "ranked_keys", "person_rank", "words", "word_keys", "trigram_table", "trigram_offsets", "trigram_keys")
+
+    def __init__(self, person_ids, **arrays):
+        self.person_ids = person_ids
+        for name in self.ARRAYS:
+            value = arrays[name]
+            if not isinstance(value, StringTable):
+                value = memoryview(value).cast("B").cast("i")
+            setattr(self, name, value)
+
+    @classmethod
+    def build(cls, people, graph) -> "NameIndex":
+        """
+        Builds the index for the <people> dict (or tables.Rows) of everyone in <graph>.
+        """
+        person_ids = graph.person_ids
+        names = [people[person_id]["name"] for person_id in person_ids]
+        births = [people[person_id]["birth"] for person_id in person_ids]
+        offsets = graph.person_offsets
+
+        # The same order as rank_people
+        ranked = sorted(range(len(person_ids)), key=lambda person: (
+            offsets[person] - offsets[person + 1], not births[person], births[person], person_ids[person]
+        ))
+        person_rank = array("i", bytes(4 * len(person_ids)))
+        for rank, person in enumerate(ranked):
+            person_rank[person] = rank
+
+        people_by_key = {}
+        for person in ranked:
+            people_by_key.setdefault(names[person].lower(), []).append(person)
+        keys = sorted(people_by_key)
+
+        key_offsets = array("i", [0])
+        key_people = array("i")
+        key_rank = array("i")
+        for key in keys:
+            key_rank.append(person_rank[people_by_key[key][0]])
+            key_people.extend(people_by_key[key])
+            key_offsets.append(len(key_people))
+
+        words = sorted((word, k) for k, key in enumerate(keys) for word in {key} | set(key.split()))
+
+        keys_by_trigram = {}
+        for k, key in enumerate(keys):
+            for trigram in trigrams(key):
+                keys_by_trigram.setdefault(trigram, array("i")).append(k)
+        trigram_table = sorted(keys_by_trigram)
+        trigram_offsets = array("i", [0])
+        trigram_keys = array("i")
+        for trigram in trigram_table:
+            trigram_keys.extend(keys_by_trigram[trigram])
+            trigram_offsets.append(len(trigram_keys))
+
+        # Keys by length: those of length n are length_keys[length_offsets[n]:length_offsets[n + 1]]
+        key_lengths = array("i", [len(key) for key in keys])
+        length_keys = array("i", sorted(range(len(keys)), key=key_lengths.__getitem__))
+        length_offsets = array("i", bytes(4 * (max(key_lengths, default=0) + 2)))
+        for length in key_lengths:
+            length_offsets[length + 1] += 1
+        for length in range(len(length_offsets) - 1):
+            length_offsets[length + 1] += length_offsets[length]
+
+        return cls(
+            person_ids,
+            keys=StringTable.build(keys),
+            key_offsets=key_offsets,
+            key_people=key_people,
+            key_rank=key_rank,
+            key_lengths=key_lengths,
+            length_keys=length_keys,
+            length_offsets=length_offsets,
+            ranked_keys=array("i", sorted(range(len(keys)), key=key_rank.__getitem__)),
+            person_rank=person_rank,
+            words=StringTable.build([word for word, _ in words]),
+            word_keys=array("i", [k for _, k in words]),
+            trigram_table=StringTable.build(trigram_table),
+            trigram_offsets=trigram_offsets,
+            trigram_keys=trigram_keys,
+        )
+
+    def prefix(self, prefix, limit=10) -> list[str]:
+        """
+        Returns up to <limit> ranked person_ids whose full name, or any word of it, starts with <prefix>.
+
+        Short prefixes match a large share of all names, so rather than ranking every match, keys are tried best
+        first until <limit> of them match. A prefix matching few words has its matches ranked directly instead.
+        """
+        prefix = prefix.lower().strip()
+        if not prefix or limit <= 0:
+            return []
+
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + "\U0010ffff", start)
+        if start == end:
+            return []
+
+        # Walking keys best first should meet a match about every len(keys) / (end - start) keys
+        budget = 4 * limit * len(self.keys) // (end - start)
+        if budget < end - start:
+            best = []
+            for k in self.ranked_keys[:budget]:
+                key = self.keys[k]
+                if key.startswith(prefix) or any(word.startswith(prefix) for word in key.split()):
+                    best.append(k)
+                    if len(best) == limit:
+                        return self.best_people(best, limit)
+
+        matches = {self.word_keys[i] for i in range(start, end)}
+        return self.best_people(heapq.nsmallest(limit, matches, key=self.key_rank.__getitem__), limit)
+
+    def fuzzy(self, name, max_distance=2, limit=10) -> list[str]:
+        """
+        Returns up to <limit> ranked person_ids whose full name is within <max_distance> edits of <name>,
+        closest names first.
+
+        Candidates are checked in tiers of how many of the query's trigrams they share, so once <limit> people
+        within some distance are found, keys sharing too few trigrams to be that close aren't checked at all.
+        """
+        name = name.lower().strip()
+        query_trigrams = trigrams(name)
+
+        # Each edit loses at most 3 of the query's trigrams, so keys within d edits share at least
+        # len(query_trigrams) - 3 * d of them
+        needed = [len(query_trigrams) - 3 * distance for distance in range(max_distance + 1)]
+
+        # A short query's trigrams are common, but few names are about as long, so those can all be checked instead
+        shortest = max(0, len(name) - max_distance)
+        longest = min(len(self.length_offsets) - 2, len(name) + max_distance)
+        window = self.length_keys[self.length_offsets[min(shortest, longest + 1)]:self.length_offsets[longest + 1]]
+        if needed[-1] < 1:
+            # Names within <max_distance> may share no trigram with the query at all
+            tiers = [window]
+        else:
+            # Only the rarest trigrams are looked up: enough that any key within <max_distance> has one of them,
+            # plus any others found in few keys; the ones left out are counted as shared by everyone
+            postings = sorted((self.trigram_keys_for(trigram) for trigram in query_trigrams), key=len)
+            used = len(query_trigrams) - needed[-1] + 1
+            while used < len(postings) and len(postings[used]) <= len(self.keys) // RARE_TRIGRAM:
+                used += 1
+            skipped = len(postings) - used
+
+            if len(window) * WINDOW_COST < sum(len(keys) for keys in postings[:used]):
+                tiers = [window]
+            else:
+                shared = Counter()
+                for keys in postings[:used]:
+                    shared.update(keys)
+                at_least = needed[-1] - skipped
+                tiers = [[] for _ in needed]
+                for k in [k for k, count in shared.items() if count >= at_least]:
+                    tiers[max(0, (len(query_trigrams) - shared[k] - skipped + 2) // 3)].append(k)
+
+        by_distance = {}
+        found = [0] * (max_distance + 1)
+        for tier, keys in enumerate(tiers):
+            for k in keys:
+                if abs(self.key_lengths[k] - len(name)) > max_distance:
+                    continue
+                key = self.keys[k]
+                if len(trigrams(key) & query_trigrams) < needed[-1]:
+                    continue
+                distance = edit_distance(name, key, max_distance)
+                if distance <= max_distance:
+                    by_distance.setdefault(distance, []).append(k)
+                    found[distance] += self.key_offsets[k + 1] - self.key_offsets[k]
+
+            # Every key within <tier> edits has been checked by now
+            if sum(found[:tier + 1]) >= limit:
+                break
+
+        result = []
+        for distance in sorted(by_distance):
+            if len(result) >= limit:
+                break
+            result.extend(self.best_people(by_distance[distance], limit - len(result)))
+
+        return result
+
+    def lookup(self, query, limit=10) -> list[str]:
+        """
+        Returns up to <limit> ranked person_ids for <query>: exact matches first, then prefix matches,
+        then fuzzy matches.
+        """
+        result = self.exact(query)
+        for lookup in (self.prefix, self.fuzzy):
+            if len(result) >= limit:
+                break
+            result.extend(person_id for person_id in lookup(query, limit=limit) if person_id not in result)
+
+        return result[:limit]
+
+    def exact(self, name) -> list[str]:
+        """
+        Returns the ranked person_ids whose name is exactly <name>, ignoring case.
+        """
+        key = name.lower().strip()
+        k = bisect_left(self.keys, key)
+        if k == len(self.keys) or self.keys[k] != key:
+            return []
+
+        return [self.person_ids[person] for person in self.key_people[self.key_offsets[k]:self.key_offsets[k + 1]]]
+
+    def best_people(self, keys, limit) -> list[str]:
+        """
+        Returns the person_ids of the <limit> best ranked people with any of <keys>.
+        """
+        people = []
+        for k in keys:
+            # Each key's people are stored best first, so no more than <limit> of them can make it
+            start = self.key_offsets[k]
+            people.extend(self.key_people[start:min(self.key_offsets[k + 1], start + limit)])
+
+        return [self.person_ids[person] for person in heapq.nsmallest(limit, people, key=self.person_rank.__getitem__)]
+
+    def trigram_keys_for(self, trigram) -> memoryview:
+        """
+        Returns the keys containing <trigram>, in key order.
+        """
+        i = bisect_left(self.trigram_table, trigram)
+        if i == len(self.trigram_table) or self.trigram_table[i] != trigram:
+            return self.trigram_keys[:0]
+
+        return self.trigram_keys[self.trigram_offsets[i]:self.trigram_offsets[i + 1]]
+
+
+def rank_people(person_ids, people, graph, limit=None) -> list[str]:
+    """
+    Orders <person_ids> for disambiguation: people in the most movies first, then by birth year
+    (unknown birth years last). If <limit> is given, only the first <limit> are returned.
+    """
+    def rank(person_id):
+        birth = people[person_id]["birth"]
+        movie_count = len(graph.movies_for(graph.person_index[person_id]))
+        return -movie_count, not birth, birth, person_id
+
+    if limit is not None:
+        return heapq.nsmallest(limit, person_ids, key=rank)
+
+    return sorted(person_ids, key=rank)
+
+
+def trigrams(text) -> set[str]:
+    """
+    Returns the set of 3-character substrings of <text>, padded so short words still have some.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit) -> int:
+    """
+    Returns the Levenshtein distance between <a> and <b>, or <limit> + 1 as soon as it's known to exceed <limit>.
+
+    Only cells within <limit> of the diagonal can stay within the limit, so only those are computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+
+    beyond = limit + 1
+    previous = [j if j <= limit else beyond for j in range(len(b) + 1)]
+    for i, a_char in enumerate(a, 1):
+        current = [beyond] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a_char != b[j - 1]))
+        if min(current) > limit:
+            return beyond
+        previous = current
+
+    return min(previous[-1], beyond)
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from batch import describe, resolve
+from cache import QueryCache
+from name_index import NameIndex
+from shared_graph import attach_graph, share_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees-of-separation queries over HTTP from a pool of worker processes."
+    )
+    parser.add_argument("directory", nargs="?", default="large", help="dataset directory (default: large)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8050, help="port to listen on (default: 8050)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of search processes (default: one per CPU)")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="number of query results to keep (default: 10000)")
+    parser.add_argument("--cached-trees", type=int, default=8,
+                        help="number of search trees to keep for the most queried sources (default: 8)")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    print("Data loaded.", file=sys.stderr)
+
+    segment, lengths = share_graph(degrees.graph)
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=attach_graph,
+                                 initargs=(segment.name, lengths, degrees.graph.person_ids,
+                                           degrees.graph.movie_ids, degrees.graph.person_index)) as pool:
+            server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+            server.names = degrees.name_index or NameIndex.build(degrees.people, degrees.graph)
+            server.cache = QueryCache(
+                max_results=args.cache_size, max_trees=args.cached_trees,
+                search=lambda source_id, target_id: pool.submit(find_path, source_id, target_id).result(),
+                build_tree=lambda source_id: pool.submit(degrees.compact_search_tree, source_id).result(),
+            )
+            print(f"Serving on http://{args.host}:{args.port}/path?source=...&target=...", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def find_path(source_id, target_id) -> None | list[tuple]:
+    """
+    Worker task: returns the shortest (movie_id, person_id) path from <source_id> to <target_id>.
+    """
+    return degrees.shortest_path(source_id, target_id, bidirectional=True)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Handles GET /path?source=<name>&target=<name>, where either name can be replaced by source_id=<person_id> or
+    target_id=<person_id> to pick one of several people with the same name. Names are resolved here, in the server
+    process, and the search itself (or the search tree built for a hot source) runs in the worker pool unless the
+    query cache can answer it. GET /names?q=<text>[&limit=<n>] returns ranked exact, prefix and typo-tolerant name
+    matches for autocomplete. GET /stats returns the cache counters.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            return self.respond(200, {**self.server.cache.stats, "hit_rate": self.server.cache.hit_rate()})
+        if url.path == "/names":
+            return self.respond(200, self.names(parse_qs(url.query)))
+        if url.path != "/path":
+            return self.respond(404, {"error": "not found"})
+
+        query = parse_qs(url.query)
+        source_id, source_name, error = self.person(query, "source")
+        if error is None:
+            target_id, target_name, error = self.person(query, "target")
+        if error is not None:
+            return self.respond(error.pop("status"), error)
+
+        path = self.server.cache.shortest_path(source_id, target_id)
+        self.respond(200, describe((source_name, target_name), path))
+
+    def person(self, query, side) -> tuple[None | str, str, None | dict]:
+        """
+        Returns (person_id, label, None) for the <side> ("source" or "target") of a /path query, given either by
+        name or, for people who share their name with others, by <side>_id. Returns (None, label, error) if it
+        doesn't identify exactly one person, with the HTTP status to answer with in error["status"].
+        """
+        person_id = query.get(f"{side}_id", [""])[0]
+        if person_id:
+            if person_id not in degrees.graph.person_index:
+                return None, person_id, {"status": 404, "error": "not found", f"{side}_id": person_id}
+            return person_id, person_id, None
+
+        name = query.get(side, [""])[0]
+        if not name:
+            return None, name, {"status": 400, "error": f"{side} or {side}_id is required"}
+        person_id, error = resolve(name)
+        if error is not None:
+            return None, name, {"status": 404, side: name, **error}
+        return person_id, name, None
+
+    def names(self, query) -> list[dict]:
+        try:
+            limit = int(query.get("limit", ["10"])[0])
+        except ValueError:
+            limit = 10
+        person_ids = self.server.names.lookup(query.get("q", [""])[0], limit)
+        return [{"person_id": person_id, **degrees.people[person_id]} for person_id in person_ids]
+
+    def respond(self, status, body):
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+if __name__ == "__main__":
+    main()
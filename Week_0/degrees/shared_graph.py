@@ -0,0 +1,46 @@
+import signal
+from multiprocessing import shared_memory
+
+import degrees
+from graph import Graph
+from snapshot import ARRAYS
+
+# The worker's handle on the shared segment, kept alive for as long as its graph views are in use
+shared = None
+
+
+def share_graph(graph) -> tuple[shared_memory.SharedMemory, list[int]]:
+    """
+    Copies the CSR arrays of <graph> back to back into a new shared memory segment.
+
+    Returns the segment, which the caller owns and must unlink, and the length of each array in ARRAYS order.
+    """
+    arrays = [getattr(graph, name) for name in ARRAYS]
+    lengths = [len(array) for array in arrays]
+    segment = shared_memory.SharedMemory(create=True, size=max(4 * sum(lengths), 1))
+
+    offset = 0
+    for array in arrays:
+        segment.buf[offset:offset + array.nbytes] = array.cast("B")
+        offset += array.nbytes
+
+    return segment, lengths
+
+
+def attach_graph(name, lengths, person_ids, movie_ids, person_index=None):
+    """
+    Worker initializer: maps the shared segment <name> and points degrees.graph at it, without copying the arrays.
+    """
+    global shared
+
+    # Ctrl+C is meant for the parent process, which shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    shared = shared_memory.SharedMemory(name=name)
+
+    arrays = []
+    offset = 0
+    for length in lengths:
+        arrays.append(shared.buf[offset:offset + 4 * length].cast("i"))
+        offset += 4 * length
+    degrees.graph = Graph(person_ids, movie_ids, *arrays, person_index=person_index)
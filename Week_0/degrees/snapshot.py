@@ -0,0 +1,143 @@
+import json
+import mmap
+import os
+import sys
+
+from graph import Graph
+from name_index import NameIndex
+from tables import IdIndex, NameMap, Rows, StringTable, sorted_order
+
+SNAPSHOT_FILE = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP\n"
+SNAPSHOT_VERSION = 5
+SOURCE_FILES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+
+# File layout:
+#   SNAPSHOT_MAGIC
+#   8-byte little-endian length of the JSON header, then the header itself
+#   the sections listed in the header, back to back, each starting on a multiple of 8 bytes
+# The header records the version, byte order, source CSV stats and the load_stats row counts, and lists each
+# section as [name, format, sizes]: an array has one part of <format> items, a string table ("strings") has an
+# int64 offsets part and a UTF-8 blob part, with sizes in bytes. Nothing but the small header is decoded on load;
+# every section is used in place through memoryviews of the mapped file.
+
+
+def source_stats(directory) -> dict[str, list[int]]:
+    """
+    Returns {filename: [mtime_ns, size]} for the CSV files a snapshot of <directory> is built from.
+    """
+    stats = {}
+    for filename in SOURCE_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        stats[filename] = [stat.st_mtime_ns, stat.st_size]
+
+    return stats
+
+
+def save_snapshot(directory, graph, people, movies, name_index, stats):
+    """
+    Writes a snapshot of <graph>, the <people> and <movies> dicts, the NameIndex of their names and the load
+    <stats> next to the CSVs in <directory>.
+    The file is written to a temporary name and moved into place, so readers never see a partial snapshot.
+    """
+    sections = {name: getattr(graph, name) for name in ARRAYS}
+    sections.update({
+        "person_ids": StringTable.build(graph.person_ids),
+        "person_order": sorted_order(graph.person_ids),
+        "person_names": StringTable.build([people[person_id]["name"] for person_id in graph.person_ids]),
+        "person_births": StringTable.build([people[person_id]["birth"] for person_id in graph.person_ids]),
+        "movie_ids": StringTable.build(graph.movie_ids),
+        "movie_order": sorted_order(graph.movie_ids),
+        "movie_titles": StringTable.build([movies[movie_id]["title"] for movie_id in graph.movie_ids]),
+        "movie_years": StringTable.build([movies[movie_id]["year"] for movie_id in graph.movie_ids]),
+    })
+    sections.update({f"name_{name}": getattr(name_index, name) for name in NameIndex.ARRAYS})
+
+    parts = []
+    listing = []
+    for name, section in sections.items():
+        if isinstance(section, StringTable):
+            section_parts = [section.offsets, section.blob]
+            listing.append([name, "strings", [part.nbytes for part in section_parts]])
+        else:
+            section_parts = [memoryview(section)]
+            listing.append([name, section_parts[0].format, [section_parts[0].nbytes]])
+        parts.extend(section_parts)
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "sources": source_stats(directory),
+        "stats": stats,
+        "sections": listing,
+    }
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(encoded).to_bytes(8, "little"))
+        f.write(encoded)
+        for part in parts:
+            f.write(bytes(-f.tell() % 8))
+            f.write(part)
+    os.replace(temporary_path, path)
+
+
+def load_snapshot(directory) -> None | tuple[Graph, Rows, Rows, NameMap, NameIndex, dict]:
+    """
+    Loads the snapshot in <directory>, memory-mapping it rather than copying anything out of it.
+
+    Returns (graph, people, movies, names, name_index, stats): the graph with binary-searched person_index and
+    movie_index, read-only stand-ins for the degrees.people, degrees.movies and degrees.names dicts (see tables.py),
+    the NameIndex and the load counts saved with them. Returns None if there is no snapshot, or if it is from
+    another version or byte order, or the CSVs have changed since it was written.
+    """
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(buffer)
+    start = len(SNAPSHOT_MAGIC) + 8
+    if view[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        return None
+    header_length = int.from_bytes(view[len(SNAPSHOT_MAGIC):start], "little")
+    try:
+        header = json.loads(bytes(view[start:start + header_length]))
+        stale = (header["version"] != SNAPSHOT_VERSION
+                 or header["byteorder"] != sys.byteorder
+                 or header["sources"] != source_stats(directory))
+    except (OSError, ValueError, KeyError):
+        return None
+    if stale:
+        return None
+
+    sections = {}
+    offset = start + header_length
+    for name, format, sizes in header["sections"]:
+        parts = []
+        for size in sizes:
+            offset += -offset % 8
+            if offset + size > len(view):
+                return None
+            parts.append(view[offset:offset + size])
+            offset += size
+        sections[name] = StringTable(*parts) if format == "strings" else parts[0].cast(format)
+
+    person_ids = sections["person_ids"]
+    movie_ids = sections["movie_ids"]
+    person_index = IdIndex(person_ids, sections["person_order"])
+    movie_index = IdIndex(movie_ids, sections["movie_order"])
+    graph = Graph(person_ids, movie_ids, *[sections[name] for name in ARRAYS],
+                  person_index=person_index, movie_index=movie_index)
+    people = Rows(person_ids, person_index, name=sections["person_names"], birth=sections["person_births"])
+    movies = Rows(movie_ids, movie_index, title=sections["movie_titles"], year=sections["movie_years"])
+    name_index = NameIndex(person_ids, **{name: sections[f"name_{name}"] for name in NameIndex.ARRAYS})
+    names = NameMap(name_index.keys, name_index.key_offsets, name_index.key_people, person_ids)
+
+    return graph, people, movies, names, name_index, header["stats"]
@@ -0,0 +1,139 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+
+
+class StringTable(Sequence):
+    """
+    Read-only sequence of strings stored as one UTF-8 <blob> and an array of int64 <offsets>, where string i is
+    blob[offsets[i]:offsets[i + 1]]. Strings are only decoded when they are read, so a table backed by a
+    memory-mapped file costs nothing to open.
+    """
+    def __init__(self, offsets, blob):
+        self.offsets = memoryview(offsets).cast("B").cast("q")
+        self.blob = memoryview(blob).cast("B")
+
+    @classmethod
+    def build(cls, strings) -> "StringTable":
+        """
+        Builds a table holding <strings>, in order.
+        """
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = array("q", [0]) * (len(encoded) + 1)
+        position = 0
+        for i, data in enumerate(encoded, 1):
+            position += len(data)
+            offsets[i] = position
+
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __reduce__(self):
+        # memoryviews can't be pickled, so worker processes get their own copy of the bytes
+        return StringTable, (bytes(self.offsets), bytes(self.blob))
+
+
+def sorted_order(strings) -> array:
+    """
+    Returns the positions of <strings> in sorted order.
+    """
+    return array("i", sorted(range(len(strings)), key=strings.__getitem__))
+
+
+class IdIndex(Mapping):
+    """
+    Read-only map from each of the distinct <ids> (a sequence of strings) to its position, found by binary search
+    over <order>, the positions sorted by id (see sorted_order). Stands in for a {id: position} dict without
+    building one.
+    """
+    def __init__(self, ids, order):
+        self.ids = ids
+        self.order = memoryview(order).cast("B").cast("i")
+
+    def __getitem__(self, id):
+        i = bisect_left(self.order, id, key=self.ids.__getitem__)
+        if i == len(self.order) or self.ids[self.order[i]] != id:
+            raise KeyError(id)
+        return self.order[i]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __reduce__(self):
+        return IdIndex, (self.ids, bytes(self.order))
+
+
+class NameMap(Mapping):
+    """
+    Read-only map from lowercased name to the set of person_ids with that name, standing in for degrees.names.
+
+    <keys> is a StringTable of the distinct lowercased names in sorted order, and the people with name keys[k] are
+    positions key_people[key_offsets[k]:key_offsets[k + 1]] of <person_ids> (as stored by name_index.NameIndex).
+    """
+    def __init__(self, keys, key_offsets, key_people, person_ids):
+        self.keys = keys
+        self.key_offsets = memoryview(key_offsets).cast("B").cast("i")
+        self.key_people = memoryview(key_people).cast("B").cast("i")
+        self.person_ids = person_ids
+
+    def find(self, key) -> None | int:
+        """
+        Returns the position of <key> in keys, or None if no one has that name.
+        """
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return i
+
+    def people_for(self, i) -> memoryview:
+        """
+        Returns the positions of the people named keys[<i>].
+        """
+        return self.key_people[self.key_offsets[i]:self.key_offsets[i + 1]]
+
+    def __getitem__(self, key):
+        i = self.find(key)
+        if i is None:
+            raise KeyError(key)
+        return {self.person_ids[person] for person in self.people_for(i)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+
+class Rows(Mapping):
+    """
+    Read-only map from id to a dict of fields, standing in for degrees.people and degrees.movies.
+
+    <index> maps each id to its position, and each of <fields> is a sequence (usually a StringTable) holding that
+    field for every position.
+    """
+    def __init__(self, ids, index, **fields):
+        self.ids = ids
+        self.index = index
+        self.fields = fields
+
+    def __getitem__(self, id):
+        i = self.index[id]
+        return {field: values[i] for field, values in self.fields.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node:
     def __init__(self, state, parent, parent_action):
         self.state = state
@@ -36,3 +39,59 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class IndexedStackFrontier:
+    """
+    Same interface as StackFrontier, but backed by a deque with a set of the states it holds, so add, remove and
+    contains_state are all O(1).
+    """
+    def __init__(self):
+        self.frontier = deque()
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states.discard(node.state)
+            return node
+
+
+class IndexedQueueFrontier(IndexedStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
+            return node
+
+
+class ExploredSet:
+    """
+    Set of explored states, with O(1) membership checks.
+    """
+    def __init__(self):
+        self.states = set()
+
+    def add(self, node):
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def __len__(self):
+        return len(self.states)
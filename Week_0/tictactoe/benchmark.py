@@ -0,0 +1,131 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+E = ttt.EMPTY
+
+# Fixed positions to search from, covering the opening, the middle game and forced endings
+POSITIONS = {
+    "empty": [[E, E, E],
+              [E, E, E],
+              [E, E, E]],
+    "x_center": [[E, E, E],
+                 [E, X, E],
+                 [E, E, E]],
+    "x_corner": [[X, E, E],
+                 [E, E, E],
+                 [E, E, E]],
+    "x_edge_o_center": [[E, X, E],
+                        [E, O, E],
+                        [E, E, E]],
+    "midgame": [[X, O, E],
+                [E, X, E],
+                [E, E, O]],
+    "o_must_block": [[X, X, E],
+                     [E, O, E],
+                     [E, E, E]],
+}
+
+# Ways to run minimax: (use_book, alpha_beta, clear the transposition table first)
+MODES = {
+    "exhaustive": (False, False, False),
+    "alpha_beta_cold": (False, True, True),
+    "alpha_beta_warm": (False, True, False),
+    "book": (True, True, False),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tictactoe.minimax, writing one JSON object per result.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=[mode for mode in MODES if mode != "exhaustive"],
+                        help="search modes to run (default: all but exhaustive, which takes minutes)")
+    parser.add_argument("--positions", nargs="+", choices=POSITIONS, default=list(POSITIONS),
+                        help="positions to search from")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per result; the fastest is kept")
+    parser.add_argument("--output", help="write results to this file instead of stdout")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare times against")
+    args = parser.parse_args()
+
+    results = [benchmark(mode, name, args.repeat) for mode in args.modes for name in args.positions]
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    for result in results:
+        output.write(json.dumps(result) + "\n")
+    if args.output:
+        output.close()
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+def benchmark(mode, name, repeat) -> dict:
+    """
+    Searches POSITIONS[name] in <mode>: <repeat> timed runs without instrumentation, then one counted run
+    and one run under tracemalloc for peak memory.
+    """
+    use_book, alpha_beta, cold = MODES[mode]
+    board = POSITIONS[name]
+
+    def run():
+        if cold:
+            ttt.table.clear()
+        return ttt.minimax(board, alpha_beta=alpha_beta, use_book=use_book)
+
+    # Warm modes are measured after the table has seen the position once
+    if not cold:
+        run()
+
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action = run()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    with ttt.instrumented({}) as counters:
+        run()
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "position": name,
+        "action": list(action) if action else None,
+        "seconds": seconds,
+        **counters,
+        "nodes_per_second": counters["nodes"] / seconds if seconds else None,
+        "peak_bytes": peak,
+        "python": platform.python_version(),
+    }
+
+
+def compare(results, baseline_path):
+    """
+    Prints how each result's time compares to the same mode and position in the baseline file,
+    and flags changed actions.
+    """
+    with open(baseline_path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    baseline = {(row["mode"], row["position"]): row for row in rows}
+
+    for result in results:
+        before = baseline.get((result["mode"], result["position"]))
+        if before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        note = "" if result["action"] == before["action"] else f"  action changed from {before['action']}"
+        print(f"{result['mode']:>16} {result['position']:<16} {ratio:6.2f}x{note}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
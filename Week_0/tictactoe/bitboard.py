@@ -0,0 +1,118 @@
+"""
+Compact Tic Tac Toe board: a pair (x, o) of 9-bit integers, where bit row * 3 + column is set if that player has
+a mark in that cell. Mirrors the board functions in tictactoe.py, with adapters to and from its list-of-lists boards.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Cell masks for every row, column and diagonal
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# Number of set bits in each 9-bit mask
+POPCOUNT = tuple(bin(mask).count("1") for mask in range(FULL + 1))
+
+
+def initial_state() -> tuple[int, int]:
+    """
+    Returns starting state of the board.
+    """
+    return 0, 0
+
+
+def from_board(board: list[list]) -> tuple[int, int]:
+    """
+    Converts a list-of-lists board (as used by tictactoe.py and runner.py) to a bitboard.
+    """
+    x = o = 0
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (r * 3 + c)
+            elif cell == O:
+                o |= 1 << (r * 3 + c)
+
+    return x, o
+
+
+def to_board(bits: tuple[int, int]) -> list[list]:
+    """
+    Converts a bitboard to a list-of-lists board.
+    """
+    x, o = bits
+    return [[X if x >> (r * 3 + c) & 1 else O if o >> (r * 3 + c) & 1 else EMPTY for c in range(3)]
+            for r in range(3)]
+
+
+def player(bits: tuple[int, int]) -> str:
+    """
+    Returns player who has the next turn on a board. X goes first, so it's X's turn when both have played
+    the same number of moves.
+    """
+    x, o = bits
+    return X if POPCOUNT[x] == POPCOUNT[o] else O
+
+
+def actions(bits: tuple[int, int]) -> list[tuple[int, int]]:
+    """
+    Returns all possible actions (i, j) available on the board.
+    """
+    empty = FULL & ~(bits[0] | bits[1])
+    return [divmod(cell, 3) for cell in range(9) if empty >> cell & 1]
+
+
+def result(bits: tuple[int, int], action: tuple[int, int]) -> tuple[int, int]:
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    row, column = action
+    if not (0 <= row < 3 and 0 <= column < 3):
+        raise Exception(f"Invalid move - position {row}, {column} is out of bounds.")
+
+    x, o = bits
+    move = 1 << (row * 3 + column)
+    if (x | o) & move:
+        raise Exception(f"Invalid move - position {row}, {column} already occupied.")
+
+    return (x | move, o) if POPCOUNT[x] == POPCOUNT[o] else (x, o | move)
+
+
+def winner(bits: tuple[int, int]) -> None | str:
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = bits
+    for mask in WIN_MASKS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+
+    return None
+
+
+def terminal(bits: tuple[int, int]) -> bool:
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (bits[0] | bits[1]) == FULL or winner(bits) is not None
+
+
+def utility(bits: tuple[int, int]) -> int:
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    winning_player = winner(bits)
+    if winning_player == X:
+        return 1
+    if winning_player == O:
+        return -1
+
+    return 0
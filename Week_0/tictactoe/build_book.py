@@ -0,0 +1,42 @@
+import sys
+
+import bitboard
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python build_book.py [output file]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_FILE
+
+    book = solve_all()
+    ttt.save_book(path, book)
+    print(f"Wrote {len(book)} positions to {path}")
+
+
+def solve_all() -> dict[int, int]:
+    """
+    Searches every position reachable from the initial state and returns the opening book: a dict mapping each
+    non-terminal position's bitboard key to the cell (row * 3 + column) minimax plays there.
+    """
+    book = {}
+    seen = set()
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        x, o = bitboard.from_board(board)
+        key = x | o << 9
+        if key in seen or ttt.terminal(board):
+            continue
+        seen.add(key)
+
+        row, column = ttt.minimax(board, use_book=False)
+        book[key] = row * 3 + column
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+
+    return book
+
+
+if __name__ == "__main__":
+    main()
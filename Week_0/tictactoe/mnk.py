@@ -0,0 +1,314 @@
+"""
+Generalized m,n,k-game: players alternate marking cells of an m x n board, and the first to get k of their marks
+in a row (horizontally, vertically or diagonally) wins. Tic Tac Toe is the 3,3,3-game.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Directions checked for k-in-a-row through a move: right, down, down-right, down-left
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Score for a won position; wins found sooner score higher (see Search.value)
+WIN_SCORE = 10 ** 9
+
+
+class Board:
+    """
+    An m x n board with cells stored row by row in a flat list. Moves are made and undone in place, and the winner
+    is updated incrementally by only checking the lines through the last move.
+    """
+
+    def __init__(self, rows=3, columns=3, k=3):
+        if not (1 <= k <= max(rows, columns)):
+            raise Exception(f"Invalid game - can't get {k} in a row on a {rows}x{columns} board.")
+        self.rows = rows
+        self.columns = columns
+        self.k = k
+        self.cells = [EMPTY] * (rows * columns)
+        self.moves = []
+        self.winner = None
+
+    @classmethod
+    def from_board(cls, board: list[list], k=3) -> "Board":
+        """
+        Builds a Board from a list-of-lists board (as used by tictactoe.py and runner.py). X is assumed to
+        have moved first.
+        """
+        game = cls(len(board), len(board[0]), k)
+        x_cells = [r * game.columns + c for r, row in enumerate(board) for c, cell in enumerate(row) if cell == X]
+        o_cells = [r * game.columns + c for r, row in enumerate(board) for c, cell in enumerate(row) if cell == O]
+        if not 0 <= len(x_cells) - len(o_cells) <= 1:
+            raise Exception("Invalid board - X moves first and the players alternate.")
+
+        # The real move order is unknown, but only the number of moves matters from here on
+        for cell in x_cells:
+            game.cells[cell] = X
+        for cell in o_cells:
+            game.cells[cell] = O
+        game.moves = x_cells + o_cells
+        game.winner = game.find_winner()
+
+        return game
+
+    def to_board(self) -> list[list]:
+        """
+        Returns the board as a list of lists.
+        """
+        return [self.cells[r * self.columns:(r + 1) * self.columns] for r in range(self.rows)]
+
+    def player(self) -> str:
+        """
+        Returns player who has the next turn on the board.
+        """
+        return X if len(self.moves) % 2 == 0 else O
+
+    def actions(self) -> list[tuple[int, int]]:
+        """
+        Returns all possible actions (i, j) available on the board.
+        """
+        return [divmod(cell, self.columns) for cell, mark in enumerate(self.cells) if mark == EMPTY]
+
+    def terminal(self) -> bool:
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.winner is not None or len(self.moves) == len(self.cells)
+
+    def play(self, action: tuple[int, int]):
+        """
+        Makes move (i, j) for the current player.
+        """
+        row, column = action
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            raise Exception(f"Invalid move - position {row}, {column} is out of bounds.")
+        cell = row * self.columns + column
+        if self.cells[cell] != EMPTY:
+            raise Exception(f"Invalid move - position {row}, {column} already occupied with {self.cells[cell]}")
+        if self.winner is not None:
+            raise Exception("Invalid move - game already won")
+
+        self.cells[cell] = self.player()
+        self.moves.append(cell)
+        if self.wins_through(cell):
+            self.winner = self.cells[cell]
+
+    def undo(self):
+        """
+        Takes back the last move.
+        """
+        cell = self.moves.pop()
+        self.cells[cell] = EMPTY
+        self.winner = None
+
+    def wins_through(self, cell) -> bool:
+        """
+        Returns True if the mark in <cell> is part of k in a row.
+        """
+        mark = self.cells[cell]
+        row, column = divmod(cell, self.columns)
+        for d_row, d_column in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * d_row, column + sign * d_column
+                while 0 <= r < self.rows and 0 <= c < self.columns and self.cells[r * self.columns + c] == mark:
+                    count += 1
+                    r, c = r + sign * d_row, c + sign * d_column
+            if count >= self.k:
+                return True
+
+        return False
+
+    def find_winner(self) -> None | str:
+        """
+        Returns the winner by checking every cell, for boards not built move by move.
+        """
+        for cell, mark in enumerate(self.cells):
+            if mark != EMPTY and self.wins_through(cell):
+                return mark
+
+        return None
+
+    def windows(self) -> list[tuple[int, ...]]:
+        """
+        Returns every line of k cells on the board, as tuples of cell indices.
+        """
+        found = []
+        for row in range(self.rows):
+            for column in range(self.columns):
+                for d_row, d_column in DIRECTIONS:
+                    end_row = row + (self.k - 1) * d_row
+                    end_column = column + (self.k - 1) * d_column
+                    if 0 <= end_row < self.rows and 0 <= end_column < self.columns:
+                        found.append(tuple((row + i * d_row) * self.columns + column + i * d_column
+                                           for i in range(self.k)))
+
+        return found
+
+
+class Timeout(Exception):
+    pass
+
+
+class Search:
+    """
+    Time-budgeted iterative-deepening alpha-beta search over a Board.
+
+    Depth 1, 2, 3, ... are searched in turn until <time_limit> seconds have passed (or <max_depth> is reached, or
+    the whole game tree has been searched), and the best move of the deepest completed search is played. Positions
+    at the depth limit are scored by evaluate. Each iteration tries the previous iteration's principal moves first.
+    """
+
+    def __init__(self, board: Board, time_limit=1.0, max_depth=None):
+        self.board = board
+        self.time_limit = time_limit
+        self.max_depth = max_depth if max_depth is not None else len(board.cells)
+        self.windows = board.windows()
+        self.order = sorted(range(len(board.cells)), key=self.centrality)
+        self.best_moves = {}
+        self.deadline = None
+        self.cancelled = False
+        self.nodes = 0
+        self.depth_reached = 0
+        self.complete = False
+
+    def centrality(self, cell) -> float:
+        """
+        Distance of <cell> from the middle of the board; central cells are part of more lines, so are tried first.
+        """
+        row, column = divmod(cell, self.board.columns)
+        return abs(row - (self.board.rows - 1) / 2) + abs(column - (self.board.columns - 1) / 2)
+
+    def cancel(self):
+        """
+        Stops the search at its next deadline check, as if its time were up. Safe to call from another thread.
+        """
+        self.cancelled = True
+
+    def best_action(self) -> None | tuple[int, int]:
+        """
+        Returns the best action found for the current player within the time budget.
+        """
+        if self.board.terminal():
+            return None
+
+        self.deadline = time.monotonic() + self.time_limit
+        start = len(self.board.moves)
+        best = self.ordered_cells()[0]
+        for depth in range(1, self.max_depth + 1):
+            if self.cancelled:
+                break
+            try:
+                cell, self.complete = self.root(depth)
+            except Timeout:
+                # Take back the moves the interrupted search was in the middle of
+                while len(self.board.moves) > start:
+                    self.board.undo()
+                break
+            best = cell
+            self.depth_reached = depth
+            if self.complete:
+                break
+
+        return divmod(best, self.board.columns)
+
+    def root(self, depth) -> tuple[int, bool]:
+        """
+        Searches to <depth> and returns the best cell, and whether the search reached the end of every line of play.
+        """
+        alpha = -math.inf
+        best = None
+        complete = True
+        for cell in self.ordered_cells():
+            self.board.play(divmod(cell, self.board.columns))
+            value, exhausted = self.value(depth - 1, -math.inf, -alpha)
+            self.board.undo()
+            value = -value
+            complete = complete and exhausted
+            if best is None or value > alpha:
+                best, alpha = cell, value
+
+        self.best_moves[len(self.board.moves)] = best
+        return best, complete
+
+    def value(self, depth, alpha, beta) -> tuple[float, bool]:
+        """
+        Negamax alpha-beta: returns the value of the board for the player to move, and whether the search
+        reached the end of every line of play below it.
+        """
+        self.nodes += 1
+        if self.nodes % 1024 == 0 and (self.cancelled or time.monotonic() > self.deadline):
+            raise Timeout
+
+        board = self.board
+        if board.winner is not None:
+            # The previous player just won; prefer wins that come sooner (and losses that come later)
+            return -(WIN_SCORE - len(board.moves)), True
+        if len(board.moves) == len(board.cells):
+            return 0, True
+        if depth == 0:
+            return self.evaluate(), False
+
+        best_value = -math.inf
+        best_cell = None
+        complete = True
+        for cell in self.ordered_cells():
+            board.play(divmod(cell, board.columns))
+            value, exhausted = self.value(depth - 1, -beta, -alpha)
+            board.undo()
+            value = -value
+            complete = complete and exhausted
+            if value > best_value:
+                best_value, best_cell = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        self.best_moves[len(board.moves)] = best_cell
+        return best_value, complete
+
+    def ordered_cells(self) -> list[int]:
+        """
+        Returns the empty cells, with the last best move found at this ply first and the rest by centrality.
+        """
+        cells = [cell for cell in self.order if self.board.cells[cell] == EMPTY]
+        killer = self.best_moves.get(len(self.board.moves))
+        if killer in cells:
+            cells.remove(killer)
+            cells.insert(0, killer)
+
+        return cells
+
+    def evaluate(self) -> float:
+        """
+        Heuristic value of an unfinished board for the player to move: every line of k cells that only one
+        player has marks in counts for that player, more so the more marks it has.
+        """
+        me = self.board.player()
+        score = 0
+        for window in self.windows:
+            mine = theirs = 0
+            for cell in window:
+                mark = self.board.cells[cell]
+                if mark == me:
+                    mine += 1
+                elif mark is not EMPTY:
+                    theirs += 1
+            if mine and not theirs:
+                score += 10 ** mine
+            elif theirs and not mine:
+                score -= 10 ** theirs
+
+        return score
+
+
+def best_action(board: list[list], k=3, time_limit=1.0, max_depth=None) -> None | tuple[int, int]:
+    """
+    Returns the best action found within <time_limit> seconds for the current player on a list-of-lists board of
+    any size, where <k> in a row wins.
+    """
+    return Search(Board.from_board(board, k), time_limit, max_depth).best_action()
@@ -1,6 +1,8 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import tictactoe as ttt
 
@@ -19,12 +21,20 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches in a background thread so the window keeps drawing and handling events meanwhile. Setting
+# ai_cancel stops the search, so Reset frees the worker for the next game straight away.
+ai_worker = ThreadPoolExecutor(max_workers=1)
+ai_cancel = None
+ai_move = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if ai_cancel is not None:
+                ai_cancel.set()
+            ai_worker.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -102,21 +112,20 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = "Computer thinking" + "." * (int(time.time() * 3) % 4)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move: start a search if none is running, and play its move once it's done
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_cancel = threading.Event()
+                ai_move = ai_worker.submit(ttt.minimax, board, cancel=ai_cancel)
+            elif ai_move.done():
+                board = ttt.result(board, ai_move.result())
+                ai_cancel = ai_move = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +136,23 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # Play Again once the game is over, or Reset at any point before that
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                user = None
+                board = ttt.initial_state()
+                # Stop any search still running, so the worker is free for the new game, and drop its move
+                if ai_cancel is not None:
+                    ai_cancel.set()
+                    ai_cancel = ai_move = None
 
     pygame.display.flip()
@@ -4,11 +4,46 @@ Tic Tac Toe Player
 
 import math
 import copy
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import bitboard
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Precomputed optimal moves for every reachable position, written by build_book.py
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+BOOK_MAGIC = b"TTTBOOK1"
+
+# Maps bitboard keys (X's cells in the low 9 bits, O's in the next 9) to the optimal cell; loaded on first use
+opening_book = None
+
+# Cells (row * 3 + column) in the order the alpha-beta search tries them: center, then corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# The 8 symmetries of the board (4 rotations, each optionally reflected), as permutations of the cells:
+# symmetry[i] is the cell whose content moves to cell i
+IDENTITY = tuple(range(9))
+ROTATE = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+REFLECT = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+SYMMETRIES = []
+for reflected in (IDENTITY, REFLECT):
+    permutation = reflected
+    for _ in range(4):
+        SYMMETRIES.append(permutation)
+        permutation = tuple(permutation[i] for i in ROTATE)
+
+# For each symmetry, the image of every 9-bit cell mask, so a bitboard can be transformed with two lookups
+SYMMETRY_MASKS = [
+    [sum(1 << i for i in range(9) if mask >> symmetry[i] & 1) for mask in range(bitboard.FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
 
 def initial_state():
     """
@@ -123,13 +158,28 @@ def utility(board: list[list]) -> int:
     return 0
 
 
-def minimax(board: list[list]) -> None | tuple[int, int]:
+def minimax(board: list[list], alpha_beta=True, use_book=True, cancel=None) -> None | tuple[int, int]:
     """
     Returns the optimal action for the current player on the board.
+
+    With <use_book> (the default) the answer comes from the precomputed opening book when the position is in it.
+    Otherwise, with <alpha_beta> (the default) the search prunes branches that can't change the result, or else it
+    explores the full game tree. All three return the same action.
+
+    <cancel> is an optional threading.Event another thread can set to stop the alpha-beta search early, in which
+    case None is returned.
     """
     if terminal(board):
         return None
 
+    if use_book:
+        move = book_move(board)
+        if move is not None:
+            return move
+
+    if alpha_beta:
+        return alpha_beta_search(board, cancel)
+
     moves = actions(board)
     if player(board) == X:
         return max([(action, min_value(result(board, action))) for action in moves], key=lambda x: x[1])[0]
@@ -137,6 +187,55 @@ def minimax(board: list[list]) -> None | tuple[int, int]:
     return min([(action, max_value(result(board, action))) for action in moves], key=lambda x: x[1])[0]
 
 
+def book_move(board: list[list]) -> None | tuple[int, int]:
+    """
+    Returns the opening book's move for the board, or None if the position (or the book file) isn't available.
+    """
+    global opening_book
+
+    if opening_book is None:
+        opening_book = load_book(BOOK_FILE)
+
+    x, o = bitboard.from_board(board)
+    cell = opening_book.get(x | o << 9)
+    if cell is None:
+        return None
+
+    return divmod(cell, 3)
+
+
+def load_book(path) -> dict[int, int]:
+    """
+    Reads an opening book written by save_book, returning an empty book if the file is missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    if not data.startswith(BOOK_MAGIC) or (len(data) - len(BOOK_MAGIC)) % 4:
+        return {}
+
+    entries = array("I")
+    entries.frombytes(data[len(BOOK_MAGIC):])
+    if sys.byteorder == "big":
+        entries.byteswap()
+    return {entry >> 4: entry & 0xF for entry in entries}
+
+
+def save_book(path, book: dict[int, int]):
+    """
+    Writes <book> compactly: BOOK_MAGIC, then one little-endian 32-bit entry (key << 4 | cell) per position,
+    sorted by key.
+    """
+    entries = array("I", sorted(key << 4 | cell for key, cell in book.items()))
+    if sys.byteorder == "big":
+        entries.byteswap()
+    with open(path, "wb") as f:
+        f.write(BOOK_MAGIC)
+        f.write(entries.tobytes())
+
+
 def max_value(board: list[list]) -> int:
     if terminal(board):
         return utility(board)
@@ -157,3 +256,211 @@ def min_value(board: list[list]) -> int:
         value = min(value, max_value(result(board, action)))
 
     return value
+
+
+def alpha_beta_search(board: list[list], cancel=None) -> None | tuple[int, int]:
+    """
+    Returns the optimal action for the current player on a non-terminal board, using alpha-beta pruning over
+    bitboards (see bitboard.py).
+
+    The moves at the root are tried in the same order as the exhaustive search in minimax, and a move only replaces
+    the best one so far if it's strictly better, so ties resolve to the same action.
+
+    If the <cancel> event is set, the search stops before the next move at the root and returns None. Each move's
+    subtree takes at most a few milliseconds, and values are only stored in the transposition table once their
+    subtree is done, so stopping leaves the table valid.
+    """
+    bits = bitboard.from_board(board)
+    best_action = None
+    alpha = -math.inf
+    beta = math.inf
+    if player(board) == X:
+        for action in actions(board):
+            if cancel is not None and cancel.is_set():
+                return None
+            value = alpha_beta_min_value(bitboard.result(bits, action), alpha, beta)
+            if best_action is None or value > alpha:
+                best_action, alpha = action, value
+            if alpha == 1:
+                break
+    else:
+        for action in actions(board):
+            if cancel is not None and cancel.is_set():
+                return None
+            value = alpha_beta_max_value(bitboard.result(bits, action), alpha, beta)
+            if best_action is None or value < beta:
+                best_action, beta = action, value
+            if beta == -1:
+                break
+
+    return best_action
+
+
+class TranspositionTable:
+    """
+    Bounded cache of searched position values for the alpha-beta search, keyed on canonical_key so all 8
+    symmetric versions of a position share one entry. Least recently used entries are evicted first.
+
+    Each entry is (value, flag): with alpha-beta a search can stop early, so the stored value is either EXACT,
+    a LOWER bound or an UPPER bound on the position's true value.
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def lookup(self, key) -> None | tuple[int, int]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, value, flag):
+        self.entries[key] = (value, flag)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Shared by every alpha-beta search; position values don't depend on how the position was reached
+table = TranspositionTable()
+
+
+def canonical_key(bits: tuple[int, int]) -> int:
+    """
+    Returns the smallest encoding (X's cells in the low 9 bits, O's in the next 9) of the bitboard over its
+    8 symmetries, so symmetric boards get the same key.
+    """
+    x, o = bits
+    return min(masks[x] | masks[o] << 9 for masks in SYMMETRY_MASKS)
+
+
+def cached_value(bits: tuple[int, int], alpha: float, beta: float) -> tuple[int, None | int]:
+    """
+    Returns (canonical key, cached value), where the cached value is None unless the table settles the board's
+    value for the window alpha..beta.
+    """
+    key = canonical_key(bits)
+    entry = table.lookup(key)
+    if entry is not None:
+        value, flag = entry
+        if (flag == TranspositionTable.EXACT
+                or (flag == TranspositionTable.LOWER and value >= beta)
+                or (flag == TranspositionTable.UPPER and value <= alpha)):
+            return key, value
+
+    return key, None
+
+
+def store_value(key, value: int, alpha: float, beta: float):
+    """
+    Stores a value searched with the window alpha..beta, flagged by whether it's exact or just a bound.
+    """
+    if value <= alpha:
+        flag = TranspositionTable.UPPER
+    elif value >= beta:
+        flag = TranspositionTable.LOWER
+    else:
+        flag = TranspositionTable.EXACT
+    table.store(key, value, flag)
+
+
+def empty_cells(bits: tuple[int, int]) -> list[int]:
+    """
+    Returns the empty cells of the bitboard in MOVE_ORDER.
+    """
+    occupied = bits[0] | bits[1]
+    return [cell for cell in MOVE_ORDER if not occupied >> cell & 1]
+
+
+def alpha_beta_max_value(bits: tuple[int, int], alpha: float, beta: float) -> int:
+    if bitboard.terminal(bits):
+        return bitboard.utility(bits)
+
+    key, value = cached_value(bits, alpha, beta)
+    if value is not None:
+        return value
+
+    window = (alpha, beta)
+    x, o = bits
+    value = -math.inf
+    for cell in empty_cells(bits):
+        value = max(value, alpha_beta_min_value((x | 1 << cell, o), alpha, beta))
+        # A win can't be improved on, and a value of at least beta means min won't allow this position
+        if value == 1 or value >= beta:
+            break
+        alpha = max(alpha, value)
+
+    store_value(key, value, *window)
+    return value
+
+
+def alpha_beta_min_value(bits: tuple[int, int], alpha: float, beta: float) -> int:
+    if bitboard.terminal(bits):
+        return bitboard.utility(bits)
+
+    key, value = cached_value(bits, alpha, beta)
+    if value is not None:
+        return value
+
+    window = (alpha, beta)
+    x, o = bits
+    value = math.inf
+    for cell in empty_cells(bits):
+        value = min(value, alpha_beta_max_value((x, o | 1 << cell), alpha, beta))
+        if value == -1 or value <= alpha:
+            break
+        beta = min(beta, value)
+
+    store_value(key, value, *window)
+    return value
+
+
+@contextmanager
+def instrumented(counters: dict):
+    """
+    Counts search work into <counters> for the duration of a with block:
+        - "nodes": positions visited by max_value/min_value or their alpha-beta versions
+        - "table_probes" / "table_hits": transposition table lookups, and those that settled a position
+        - "book_probes" / "book_hits": opening book lookups, and those that found a move
+
+    The search functions are swapped for counting wrappers and restored afterwards, so searches outside the block
+    don't pay anything for the counters.
+    """
+    for name in ("nodes", "table_probes", "table_hits", "book_probes", "book_hits"):
+        counters.setdefault(name, 0)
+    module = sys.modules[__name__]
+
+    def count_node(function):
+        def wrapper(*args):
+            counters["nodes"] += 1
+            return function(*args)
+        return wrapper
+
+    def count_probe(function, probes, hits, hit):
+        def wrapper(*args):
+            found = function(*args)
+            counters[probes] += 1
+            if hit(found):
+                counters[hits] += 1
+            return found
+        return wrapper
+
+    searches = ("max_value", "min_value", "alpha_beta_max_value", "alpha_beta_min_value")
+    originals = {name: getattr(module, name) for name in searches + ("cached_value", "book_move")}
+    for name in searches:
+        setattr(module, name, count_node(originals[name]))
+    module.cached_value = count_probe(originals["cached_value"], "table_probes", "table_hits",
+                                      lambda found: found[1] is not None)
+    module.book_move = count_probe(originals["book_move"], "book_probes", "book_hits", lambda found: found is not None)
+    try:
+        yield counters
+    finally:
+        for name, function in originals.items():
+            setattr(module, name, function)
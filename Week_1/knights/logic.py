@@ -1,4 +1,18 @@
 import itertools
+import multiprocessing
+import os
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Symbols whose assignments are evaluated together, as bits of one integer (2^16 models)
+CHUNK_SYMBOLS = 16
+
+# Number of recently checked knowledge bases whose Horn clauses and forward chaining results are kept
+HORN_CACHE_SIZE = 64
+
+# Levels of subsentences a compiled expression nests before they are assigned to locals (see compile_function)
+COMPILE_NESTING = 32
 
 
 class Sentence:
@@ -99,7 +113,8 @@ class And(Sentence):
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        # Interned conjunctions keep their conjuncts in a tuple
+        return isinstance(other, And) and tuple(self.conjuncts) == tuple(other.conjuncts)
 
     def __hash__(self):
         return hash(
@@ -126,7 +141,7 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
@@ -136,7 +151,7 @@ class Or(Sentence):
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return isinstance(other, Or) and tuple(self.disjuncts) == tuple(other.disjuncts)
 
     def __hash__(self):
         return hash(
@@ -157,7 +172,7 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
@@ -227,6 +242,14 @@ class Biconditional(Sentence):
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
+    # Simplifying first can only remove work: fewer symbols to enumerate and smaller sentences to evaluate
+    knowledge, query = simplify(knowledge), simplify(query)
+
+    # Horn knowledge bases answer literal queries by forward chaining, without enumerating models
+    entailed = horn_check(knowledge, query)
+    if entailed is not None:
+        return entailed
+
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
@@ -260,3 +283,844 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class CNF:
+    """Clauses in conjunctive normal form, built from sentences by Tseitin encoding.
+
+    Each symbol and each compound subsentence gets an integer variable; a clause is
+    a list of literals, where -v is the negation of variable v.
+    """
+
+    def __init__(self):
+        self.variables = dict()
+        self.encoded = dict()
+        self.clauses = []
+        self.count = 0
+
+    def variable(self, name=None):
+        """Returns the variable for a symbol name, or a fresh one if name is None."""
+        if name is not None and name in self.variables:
+            return self.variables[name]
+        self.count += 1
+        if name is not None:
+            self.variables[name] = self.count
+        return self.count
+
+    def checkpoint(self):
+        """Returns the current state, for rollback to return to."""
+        return len(self.clauses), self.count
+
+    def rollback(self, checkpoint):
+        """Removes the clauses and variables added since checkpoint was taken."""
+        clauses, count = checkpoint
+        del self.clauses[clauses:]
+        self.count = count
+        # Variables are numbered in the order they were added, and both dicts keep that order
+        for table in (self.variables, self.encoded):
+            while table and next(reversed(table.values())) > count:
+                table.popitem()
+
+    def add(self, sentence):
+        """Adds clauses requiring sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.encode(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            # Needs no variable of its own: a => b is the clause ¬a ∨ b
+            a = self.encode(sentence.antecedent)
+            b = self.encode(sentence.consequent)
+            self.clauses.append([-a, b])
+        elif isinstance(sentence, Biconditional):
+            a = self.encode(sentence.left)
+            b = self.encode(sentence.right)
+            self.clauses.extend([[-a, b], [a, -b]])
+        else:
+            self.clauses.append([self.encode(sentence)])
+
+    def encode(self, sentence):
+        """Returns a literal equivalent to sentence, adding defining clauses."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.encode(sentence.operand)
+        if sentence in self.encoded:
+            return self.encoded[sentence]
+
+        v = self.variable()
+        if isinstance(sentence, And):
+            literals = [self.encode(c) for c in sentence.conjuncts]
+            self.clauses.extend([-v, literal] for literal in literals)
+            self.clauses.append([v] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.encode(d) for d in sentence.disjuncts]
+            self.clauses.extend([v, -literal] for literal in literals)
+            self.clauses.append([-v] + literals)
+        elif isinstance(sentence, Implication):
+            a = self.encode(sentence.antecedent)
+            b = self.encode(sentence.consequent)
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.encode(sentence.left)
+            b = self.encode(sentence.right)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.encoded[sentence] = v
+        return v
+
+
+def dpll_satisfiable(clauses):
+    """Returns a set of true literals satisfying the clauses, or None if unsatisfiable.
+
+    Variables missing from the result can take either value. Pure literals are set
+    before the search starts. During the search each clause watches two of its
+    literals that aren't false, and is only looked at again when one of them
+    becomes false, so unit propagation takes time proportional to the clauses it
+    actually touches. Assignments are undone by popping them off the trail.
+    """
+    true = set()
+    trail = []
+    watching = dict()
+    units = []
+    counts = dict()
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            continue
+        if not clause:
+            return None
+        for literal in clause:
+            counts[literal] = counts.get(literal, 0) + 1
+        if len(clause) == 1:
+            units.append(clause[0])
+        else:
+            watching.setdefault(clause[0], []).append(clause)
+            watching.setdefault(clause[1], []).append(clause)
+
+    def assign(literal):
+        """Makes literal true, returning False if it is already false."""
+        if literal in true:
+            return True
+        if -literal in true:
+            return False
+        true.add(literal)
+        trail.append(literal)
+        return True
+
+    def propagate(start):
+        """Assigns the literals forced by the assignments from trail[start] on, returning False on a conflict."""
+        while start < len(trail):
+            false = -trail[start]
+            start += 1
+            watchers = watching.get(false, [])
+            kept = []
+            for i, clause in enumerate(watchers):
+                # Keep the false literal second, so clause[0] is the other watch
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if clause[0] in true:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if -clause[k] not in true:
+                        clause[1], clause[k] = clause[k], false
+                        watching.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if not assign(clause[0]):
+                        kept.extend(watchers[i + 1:])
+                        watching[false] = kept
+                        return False
+            watching[false] = kept
+        return True
+
+    def undo(size):
+        """Takes back the assignments after the first size on the trail."""
+        for literal in trail[size:]:
+            true.discard(literal)
+        del trail[size:]
+
+    # Pure literal elimination: a literal whose negation appears in no clause can be made true without
+    # falsifying anything
+    pure = [literal for literal in counts if -literal not in counts]
+    if not all(assign(literal) for literal in units + pure) or not propagate(0):
+        return None
+
+    # Branch on the variables appearing in the most clauses first, trying their more common value first
+    order = sorted({abs(literal) for literal in counts},
+                   key=lambda v: -counts.get(v, 0) - counts.get(-v, 0))
+    decisions = []
+    position = 0
+    while True:
+        while position < len(order) and (order[position] in true or -order[position] in true):
+            position += 1
+        if position == len(order):
+            return frozenset(true)
+        variable = order[position]
+        literal = variable if counts.get(variable, 0) >= counts.get(-variable, 0) else -variable
+        decisions.append((len(trail), position, literal, False))
+        assign(literal)
+
+        # On a conflict, flip the latest decision not yet tried both ways
+        while not propagate(decisions[-1][0]):
+            while decisions and decisions[-1][3]:
+                decisions.pop()
+            if not decisions:
+                return None
+            size, position, literal, _ = decisions.pop()
+            undo(size)
+            decisions.append((size, position, -literal, True))
+            assign(-literal)
+
+
+def dpll_check(knowledge, query):
+    """Checks if knowledge base entails query, by showing knowledge ∧ ¬query is unsatisfiable."""
+    cnf = CNF()
+    cnf.add(simplify(And(knowledge, Not(query))))
+    return dpll_satisfiable(cnf.clauses) is None
+
+
+def compile_function(sentence, parameters, source):
+    """Compiles sentence into a Python function of parameters.
+
+    source(sentence, parts) returns Python source for a sentence given the
+    source of its subsentences. Parts are nested into one expression, but
+    once that nesting reaches COMPILE_NESTING levels the subsentence is
+    assigned to a local variable first, so deep sentences stay within the
+    parser's limits on nested parentheses.
+    """
+    lines = []
+
+    def visit(sentence):
+        """Returns Python source for sentence, and how deeply it nests."""
+        if isinstance(sentence, Symbol):
+            return source(sentence, []), 1
+        if isinstance(sentence, Not):
+            parts = [visit(sentence.operand)]
+        elif isinstance(sentence, And):
+            parts = [visit(c) for c in sentence.conjuncts]
+        elif isinstance(sentence, Or):
+            parts = [visit(d) for d in sentence.disjuncts]
+        elif isinstance(sentence, Implication):
+            parts = [visit(sentence.antecedent), visit(sentence.consequent)]
+        elif isinstance(sentence, Biconditional):
+            parts = [visit(sentence.left), visit(sentence.right)]
+        else:
+            raise TypeError("must be a logical sentence")
+        expression = source(sentence, [part for part, _ in parts])
+        depth = 1 + max((depth for _, depth in parts), default=0)
+        if depth < COMPILE_NESTING:
+            return expression, depth
+        name = f"s{len(lines)}"
+        lines.append(f"    {name} = {expression}")
+        return name, 1
+
+    expression, _ = visit(sentence)
+    namespace = dict()
+    exec("\n".join([f"def compiled({parameters}):", *lines, f"    return {expression}"]), namespace)
+    return namespace["compiled"]
+
+
+def compile_sentence(sentence, symbols):
+    """Compiles sentence into a function of a bitmask model.
+
+    Bit i of the model is the truth value of the symbol named symbols[i]. The
+    sentence becomes Python bit tests and boolean operators (see
+    compile_function), so evaluating a model needs no tree walk or dict lookups.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+
+    def source(sentence, parts):
+        """Returns Python source for sentence, in terms of model bits m."""
+        if isinstance(sentence, Symbol):
+            try:
+                return f"(m & {1 << index[sentence.name]} != 0)"
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in model")
+        if isinstance(sentence, Not):
+            return f"(not {parts[0]})"
+        if isinstance(sentence, And):
+            return "(" + " and ".join(parts) + ")" if parts else "True"
+        if isinstance(sentence, Or):
+            return "(" + " or ".join(parts) + ")" if parts else "False"
+        if isinstance(sentence, Implication):
+            return f"(not {parts[0]} or {parts[1]})"
+        return f"({parts[0]} == {parts[1]})"
+
+    return compile_function(sentence, "m", source)
+
+
+def compiled_model_check(knowledge, query):
+    """Checks if knowledge base entails query, using compiled sentences over bitmask models."""
+    counter_model = simplify(And(knowledge, Not(query)))
+    symbols = sorted(counter_model.symbols())
+    counter_model = compile_sentence(counter_model, symbols)
+    return not any(counter_model(m) for m in range(1 << len(symbols)))
+
+
+def compile_bitwise(sentence, symbols):
+    """Compiles sentence into a function evaluating many models at once.
+
+    The function takes a list of columns, where bit j of columns[i] is the truth
+    value of the symbol named symbols[i] in model j, and a mask of all the models'
+    bits. It returns an integer whose bit j is the sentence's value in model j.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+
+    def source(sentence, parts):
+        """Returns Python source for sentence, in terms of columns c and mask f."""
+        if isinstance(sentence, Symbol):
+            try:
+                return f"c[{index[sentence.name]}]"
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in model")
+        if isinstance(sentence, Not):
+            return f"(f ^ {parts[0]})"
+        if isinstance(sentence, And):
+            return "(" + " & ".join(parts) + ")" if parts else "f"
+        if isinstance(sentence, Or):
+            return "(" + " | ".join(parts) + ")" if parts else "0"
+        if isinstance(sentence, Implication):
+            return f"((f ^ {parts[0]}) | {parts[1]})"
+        return f"(f ^ {parts[0]} ^ {parts[1]})"
+
+    return compile_function(sentence, "c, f", source)
+
+
+def truth_table_columns(count):
+    """Returns columns for every assignment of count symbols, and a mask of all their bits.
+
+    Column i repeats 2^i zeros then 2^i ones, so bit j of column i is bit i of j.
+    """
+    full = (1 << (1 << count)) - 1
+    columns = []
+    for i in range(count):
+        ones = ((1 << (1 << i)) - 1) << (1 << i)
+        columns.append(full // ((1 << (1 << (i + 1))) - 1) * ones)
+    return columns, full
+
+
+def truth_table_check(knowledge, query, chunk_symbols=CHUNK_SYMBOLS):
+    """Checks if knowledge base entails query by evaluating the truth table in chunks.
+
+    Each chunk covers all assignments of the first chunk_symbols symbols at once,
+    as bits of one integer per symbol, with the remaining symbols fixed; the
+    knowledge base entails the query if no chunk has a model where the knowledge
+    base is true and the query is false.
+    """
+    counter_models = simplify(And(knowledge, Not(query)))
+    symbols = sorted(counter_models.symbols())
+    counter_models = compile_bitwise(counter_models, symbols)
+    low = min(len(symbols), chunk_symbols)
+    columns, full = truth_table_columns(low)
+
+    # Symbols fixed within a chunk: all true or all false, by the chunk's number
+    for chunk in range(1 << (len(symbols) - low)):
+        fixed = [full if chunk >> i & 1 else 0 for i in range(len(symbols) - low)]
+        if counter_models(columns + fixed, full):
+            return False
+    return True
+
+
+def model_check_all(knowledge, queries):
+    """Checks which of queries knowledge base entails, in one pass over the truth table.
+
+    Returns a list of booleans in the same order as queries. Each chunk of models
+    evaluates the knowledge base once, and only the queries not yet refuted.
+    Horn knowledge bases with literal queries are answered by forward chaining.
+    """
+    knowledge = simplify(knowledge)
+    queries = [simplify(query) for query in queries]
+    closure = horn_closure(knowledge)
+    if closure is not None:
+        entailed = [horn_entails(*closure, query) for query in queries]
+        if None not in entailed:
+            return entailed
+
+    symbols = sorted(set.union(knowledge.symbols(), *[query.symbols() for query in queries]))
+    knowledge_rows = compile_bitwise(knowledge, symbols)
+    query_rows = [compile_bitwise(query, symbols) for query in queries]
+    low = min(len(symbols), CHUNK_SYMBOLS)
+    columns, full = truth_table_columns(low)
+
+    entailed = [True] * len(queries)
+    for chunk in range(1 << (len(symbols) - low)):
+        fixed = [full if chunk >> i & 1 else 0 for i in range(len(symbols) - low)]
+        rows = knowledge_rows(columns + fixed, full)
+        if not rows:
+            continue
+        for i, query in enumerate(query_rows):
+            if entailed[i] and rows & (full ^ query(columns + fixed, full)):
+                entailed[i] = False
+        if not any(entailed):
+            break
+    return entailed
+
+
+def parallel_model_check(knowledge, query, workers=None, fixed_symbols=None):
+    """Checks if knowledge base entails query, splitting the truth table over processes.
+
+    Each task fixes the values of the last fixed_symbols symbols (by default
+    enough for about four tasks per worker) and checks the models with those
+    values in chunks, as truth_table_check does. As soon as one task finds a
+    model where the knowledge base is true and the query false, the other tasks
+    stop.
+    """
+    workers = workers or os.cpu_count()
+    counter_models = simplify(And(knowledge, Not(query)))
+    symbols = sorted(counter_models.symbols())
+    chunked = max(0, len(symbols) - CHUNK_SYMBOLS)
+    if fixed_symbols is None:
+        fixed_symbols = (4 * workers - 1).bit_length()
+    fixed_symbols = min(fixed_symbols, chunked)
+    if workers == 1 or fixed_symbols == 0:
+        return truth_table_check(knowledge, query)
+
+    stop = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=attach_check,
+                             initargs=(counter_models, symbols, fixed_symbols, stop)) as pool:
+        futures = [pool.submit(check_partition, partition) for partition in range(1 << fixed_symbols)]
+        for future in as_completed(futures):
+            if not future.result():
+                stop.set()
+                for other in futures:
+                    other.cancel()
+                return False
+    return True
+
+
+# State for check_partition in each worker process, set by attach_check
+partition_check = None
+
+
+def attach_check(counter_models, symbols, fixed_symbols, stop):
+    """Worker initializer: compiles the check for parallel_model_check once per process."""
+    global partition_check
+    partition_check = (compile_bitwise(counter_models, symbols), len(symbols), fixed_symbols, stop)
+
+
+def check_partition(partition):
+    """Worker task: checks the models whose last symbols have the values in the bits of partition."""
+    counter_models, count, fixed_symbols, stop = partition_check
+    low = min(count, CHUNK_SYMBOLS)
+    varying = count - low - fixed_symbols
+    columns, full = truth_table_columns(low)
+    last = [full if partition >> i & 1 else 0 for i in range(fixed_symbols)]
+    for chunk in range(1 << varying):
+        if stop.is_set():
+            break
+        fixed = [full if chunk >> i & 1 else 0 for i in range(varying)]
+        if counter_models(columns + fixed + last, full):
+            stop.set()
+            return False
+    return True
+
+
+class Interned:
+    """Mixin for interned sentences, whose hash is computed once when they are created.
+
+    Interned sentences are shared, so they can't be modified: their parts are
+    tuples, and setting attributes or adding conjuncts raises.
+    """
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __setattr__(self, name, value):
+        raise AttributeError("interned sentences can't be modified")
+
+    def __delattr__(self, name):
+        raise AttributeError("interned sentences can't be modified")
+
+    def add(self, conjunct):
+        raise TypeError("interned sentences can't be modified")
+
+    def __reduce__(self):
+        """Pickles the sentence so that it is interned again when unpickled."""
+        return make_interned, self.interned_from
+
+
+# Interned version of each sentence class; they behave the same apart from the cached hash
+INTERNED = {
+    cls: type(cls.__name__, (Interned, cls), {})
+    for cls in (Symbol, Not, And, Or, Implication, Biconditional)
+}
+
+# The attributes holding each sentence class's parts, in order; And and Or keep all their parts in one tuple
+PARTS = {
+    Symbol: ("name",),
+    Not: ("operand",),
+    Implication: ("antecedent", "consequent"),
+    Biconditional: ("left", "right"),
+}
+
+# Interned sentences, by class and the identities of their (interned) parts. Entries go away with the last
+# reference to their sentence, and a sentence keeps its parts alive, so the identities in live keys stay valid.
+interned = weakref.WeakValueDictionary()
+
+# The constants: an empty conjunction is always true, an empty disjunction always false
+TRUE = None
+FALSE = None
+
+
+def intern_sentence(sentence):
+    """Returns the one interned sentence structurally equal to sentence.
+
+    Interned sentences share identical subsentences, so they can't be modified.
+    """
+    if isinstance(sentence, Interned):
+        return sentence
+    if isinstance(sentence, Symbol):
+        cls, parts = Symbol, (sentence.name,)
+    elif isinstance(sentence, Not):
+        cls, parts = Not, (intern_sentence(sentence.operand),)
+    elif isinstance(sentence, And):
+        cls, parts = And, tuple(intern_sentence(c) for c in sentence.conjuncts)
+    elif isinstance(sentence, Or):
+        cls, parts = Or, tuple(intern_sentence(d) for d in sentence.disjuncts)
+    elif isinstance(sentence, Implication):
+        cls, parts = Implication, (intern_sentence(sentence.antecedent),
+                                   intern_sentence(sentence.consequent))
+    elif isinstance(sentence, Biconditional):
+        cls, parts = Biconditional, (intern_sentence(sentence.left),
+                                     intern_sentence(sentence.right))
+    else:
+        raise TypeError("must be a logical sentence")
+    return make_interned(cls, parts)
+
+
+def make_interned(cls, parts):
+    """Returns the interned sentence of class cls built from interned parts."""
+    key = (cls, parts) if cls is Symbol else (cls, tuple(id(part) for part in parts))
+    sentence = interned.get(key)
+    if sentence is None:
+        # Built without __init__, which would store the parts in a list, and the parts are interned already
+        sentence = object.__new__(INTERNED[cls])
+        if cls is And or cls is Or:
+            fields = {"conjuncts" if cls is And else "disjuncts": parts}
+        else:
+            fields = dict(zip(PARTS[cls], parts))
+        for name, value in fields.items():
+            object.__setattr__(sentence, name, value)
+        object.__setattr__(sentence, "hash_value", cls.__hash__(sentence))
+        object.__setattr__(sentence, "interned_from", (cls, parts))
+        interned[key] = sentence
+    return sentence
+
+
+def simplify(sentence):
+    """Returns an interned sentence equivalent to sentence, simplified.
+
+    Nested conjunctions and disjunctions are flattened and their duplicate
+    parts dropped, double negations removed, and constants (TRUE and FALSE,
+    or a part together with its negation) folded away.
+    """
+    sentence = intern_sentence(sentence)
+    simplified = dict()
+
+    def negate(sentence):
+        if isinstance(sentence, Not):
+            return sentence.operand
+        if sentence is TRUE:
+            return FALSE
+        if sentence is FALSE:
+            return TRUE
+        return make_interned(Not, (sentence,))
+
+    def connective(cls, parts):
+        """Simplifies a conjunction (cls And) or disjunction (cls Or) of simplified parts."""
+        identity, absorbing = (TRUE, FALSE) if cls is And else (FALSE, TRUE)
+        flattened = dict()
+        for part in parts:
+            for p in (part.conjuncts if cls is And else part.disjuncts) if isinstance(part, cls) else [part]:
+                flattened[p] = None
+        flattened.pop(identity, None)
+        if absorbing in flattened or any(negate(p) in flattened for p in flattened):
+            return absorbing
+        if len(flattened) == 1:
+            return next(iter(flattened))
+        return make_interned(cls, tuple(flattened))
+
+    def visit(sentence):
+        if sentence in simplified:
+            return simplified[sentence]
+        if isinstance(sentence, Symbol):
+            result = sentence
+        elif isinstance(sentence, Not):
+            result = negate(visit(sentence.operand))
+        elif isinstance(sentence, And):
+            result = connective(And, [visit(c) for c in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            result = connective(Or, [visit(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            antecedent, consequent = visit(sentence.antecedent), visit(sentence.consequent)
+            if antecedent is TRUE:
+                result = consequent
+            elif consequent is FALSE:
+                result = negate(antecedent)
+            elif antecedent is FALSE or consequent is TRUE or antecedent is consequent:
+                result = TRUE
+            else:
+                result = make_interned(Implication, (antecedent, consequent))
+        else:
+            left, right = visit(sentence.left), visit(sentence.right)
+            if left is right:
+                result = TRUE
+            elif left is negate(right):
+                result = FALSE
+            elif left in (TRUE, FALSE) or right in (TRUE, FALSE):
+                constant, other = (left, right) if left in (TRUE, FALSE) else (right, left)
+                result = other if constant is TRUE else negate(other)
+            else:
+                result = make_interned(Biconditional, (left, right))
+        simplified[sentence] = result
+        return result
+
+    return visit(sentence)
+
+
+TRUE = make_interned(And, ())
+FALSE = make_interned(Or, ())
+
+
+def horn_clauses(sentence):
+    """Returns sentence as Horn clauses, or None if it can't be written as them.
+
+    A clause is a pair (premises, head): a frozenset of symbol names whose
+    conjunction implies the symbol named head, or a contradiction if head is
+    None. A clause with no premises is a fact.
+    """
+    def symbol_names(sentence):
+        """Returns the names in a symbol or conjunction of symbols, or None."""
+        if isinstance(sentence, Symbol):
+            return {sentence.name}
+        if isinstance(sentence, And) and all(isinstance(c, Symbol) for c in sentence.conjuncts):
+            return {c.name for c in sentence.conjuncts}
+        return None
+
+    if isinstance(sentence, Symbol):
+        return [(frozenset(), sentence.name)]
+    if isinstance(sentence, And):
+        clauses = []
+        for conjunct in sentence.conjuncts:
+            part = horn_clauses(conjunct)
+            if part is None:
+                return None
+            clauses.extend(part)
+        return clauses
+    if isinstance(sentence, Not):
+        if isinstance(sentence.operand, Or):
+            return horn_clauses(And(*[Not(d) for d in sentence.operand.disjuncts]))
+        premises = symbol_names(sentence.operand)
+        return None if premises is None else [(frozenset(premises), None)]
+    if isinstance(sentence, Or):
+        premises = set()
+        heads = []
+        for disjunct in sentence.disjuncts:
+            if isinstance(disjunct, Symbol):
+                heads.append(disjunct.name)
+            elif isinstance(disjunct, Not) and symbol_names(disjunct.operand) is not None:
+                premises |= symbol_names(disjunct.operand)
+            else:
+                return None
+        return [(frozenset(premises), heads[0] if heads else None)] if len(heads) <= 1 else None
+    if isinstance(sentence, Implication):
+        premises = symbol_names(sentence.antecedent)
+        consequent = horn_clauses(sentence.consequent)
+        if premises is None or consequent is None:
+            return None
+        return [(body | premises, head) for body, head in consequent]
+    if isinstance(sentence, Biconditional):
+        forward = horn_clauses(Implication(sentence.left, sentence.right))
+        backward = horn_clauses(Implication(sentence.right, sentence.left))
+        return None if forward is None or backward is None else forward + backward
+    return None
+
+
+def forward_chain(clauses, facts=()):
+    """Derives everything Horn clauses imply, in time linear in their size.
+
+    Returns the set of symbol names derived, and whether a contradiction was. Each
+    clause counts its premises not yet derived, and its head joins the agenda when
+    the count reaches zero.
+    """
+    remaining = [len(premises) for premises, _ in clauses]
+    clauses_with = dict()
+    for i, (premises, _) in enumerate(clauses):
+        for premise in premises:
+            clauses_with.setdefault(premise, []).append(i)
+
+    agenda = [head for premises, head in clauses if not premises] + list(facts)
+    inferred = set()
+    while agenda:
+        symbol = agenda.pop()
+        if symbol is None:
+            return inferred, True
+        if symbol in inferred:
+            continue
+        inferred.add(symbol)
+        for i in clauses_with.get(symbol, ()):
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                agenda.append(clauses[i][1])
+    return inferred, False
+
+
+def horn_entails(clauses, inferred, contradiction, query):
+    """Checks if Horn clauses entail query, given what forward chaining derived from them.
+
+    Returns None if query isn't a literal or conjunction of literals.
+    """
+    if contradiction:
+        return True
+    if isinstance(query, Symbol):
+        return query.name in inferred
+    if isinstance(query, Not) and isinstance(query.operand, Symbol):
+        # The clauses entail ¬p if adding p as a fact leads to a contradiction
+        return query.operand.name not in inferred and forward_chain(clauses, [query.operand.name])[1]
+    if isinstance(query, And):
+        entailed = [horn_entails(clauses, inferred, contradiction, c) for c in query.conjuncts]
+        return None if None in entailed else all(entailed)
+    return None
+
+
+# Recently checked simplified knowledge bases, least recently used first, with their horn_closure (or False if
+# they aren't Horn). Holding them keeps them interned, so simplifying an equal knowledge base finds them again.
+horn_closures = OrderedDict()
+
+
+def horn_closure(knowledge):
+    """Returns (clauses, inferred, contradiction) for a simplified knowledge base, or None if it isn't Horn.
+
+    These are its Horn clauses and what forward chaining derives from them. The
+    results for the last HORN_CACHE_SIZE knowledge bases are kept, so checking
+    many queries against one knowledge base only does this work once.
+    """
+    closure = horn_closures.get(knowledge)
+    if closure is None:
+        clauses = horn_clauses(knowledge)
+        closure = False if clauses is None else (clauses, *forward_chain(clauses))
+    horn_closures[knowledge] = closure
+    horn_closures.move_to_end(knowledge)
+    if len(horn_closures) > HORN_CACHE_SIZE:
+        horn_closures.popitem(last=False)
+    return closure or None
+
+
+def horn_check(knowledge, query):
+    """Checks if a simplified knowledge base entails query by forward chaining.
+
+    Returns None if the knowledge base isn't Horn or query isn't a literal or
+    conjunction of literals.
+    """
+    closure = horn_closure(knowledge)
+    return None if closure is None else horn_entails(*closure, query)
+
+
+def forward_chain_check(knowledge, query):
+    """Checks if Horn knowledge base entails a literal or conjunction of literals by forward chaining."""
+    closure = horn_closure(simplify(knowledge))
+    if closure is None:
+        raise Exception("knowledge base is not made of Horn clauses")
+    entailed = horn_entails(*closure, query)
+    if entailed is None:
+        raise Exception("query must be a literal or conjunction of literals")
+    return entailed
+
+
+class KnowledgeBase(And):
+    """A conjunction of sentences, prepared once for checking many queries.
+
+    Symbols, the hash, the truth table and the CNF clauses are computed the
+    first time they are needed and kept until add changes the knowledge base.
+    """
+
+    def __init__(self, *conjuncts):
+        super().__init__(*conjuncts)
+        self.invalidate()
+
+    def invalidate(self):
+        """Discards everything computed from the conjuncts."""
+        self.cached_symbols = None
+        self.cached_hash = None
+        self.table = None
+        self.cnf = None
+        self.horn = None
+
+    def add(self, conjunct):
+        super().add(conjunct)
+        self.invalidate()
+
+    def __hash__(self):
+        if self.cached_hash is None:
+            self.cached_hash = super().__hash__()
+        return self.cached_hash
+
+    def symbols(self):
+        """Returns the set of all symbols in the knowledge base, which must not be modified."""
+        if self.cached_symbols is None:
+            self.cached_symbols = set().union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return self.cached_symbols
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query.
+
+        Horn knowledge bases keep everything forward chaining derives from them, so
+        literal queries are answered from that. Otherwise small knowledge bases keep
+        their truth table, so a query over their symbols only needs the query
+        evaluated, and others keep their CNF clauses for DPLL.
+        """
+        entailed = self.horn_entails(query)
+        if entailed is not None:
+            return entailed
+        symbols = self.symbols()
+        if len(symbols) <= CHUNK_SYMBOLS and query.symbols() <= symbols:
+            order, columns, full, rows = self.truth_table()
+            return not rows & (full ^ compile_bitwise(query, order)(columns, full))
+        return self.dpll_entails(query)
+
+    def horn_entails(self, query):
+        """Checks if a Horn knowledge base entails query by forward chaining.
+
+        Returns None if the knowledge base isn't Horn or query isn't a literal or
+        conjunction of literals.
+        """
+        if self.horn is None:
+            clauses = horn_clauses(simplify(And(*self.conjuncts)))
+            self.horn = False if clauses is None else (clauses, *forward_chain(clauses))
+        if not self.horn:
+            return None
+        return horn_entails(*self.horn, query)
+
+    def truth_table(self):
+        """Returns symbol order, columns, mask and the bits of models where the knowledge base is true."""
+        if self.table is None:
+            order = sorted(self.symbols())
+            columns, full = truth_table_columns(len(order))
+            rows = compile_bitwise(simplify(And(*self.conjuncts)), order)(columns, full)
+            self.table = order, columns, full, rows
+        return self.table
+
+    def dpll_entails(self, query):
+        """Checks if the knowledge base entails query using DPLL on the cached clauses."""
+        if self.cnf is None:
+            self.cnf = CNF()
+            self.cnf.add(simplify(And(*self.conjuncts)))
+
+        # The query's definitions are only needed for this check, so the cached clauses don't grow with every query
+        checkpoint = self.cnf.checkpoint()
+        self.cnf.add(Not(query))
+        try:
+            return dpll_satisfiable(self.cnf.clauses) is None
+        finally:
+            self.cnf.rollback(checkpoint)
+
+    def entails_all(self, queries):
+        """Checks which of queries the knowledge base entails, returning a list of booleans."""
+        return [self.entails(query) for query in queries]
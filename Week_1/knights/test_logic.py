@@ -0,0 +1,210 @@
+import itertools
+import random
+import unittest
+
+import logic
+from logic import *
+
+SYMBOLS = [Symbol(name) for name in "PQRSTU"]
+
+
+def random_sentence(rng, depth):
+    """Returns a random sentence over SYMBOLS, nested at most depth levels."""
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(SYMBOLS)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return Not(random_sentence(rng, depth - 1))
+    if kind == 1:
+        return And(*[random_sentence(rng, depth - 1) for _ in range(rng.randint(1, 3))])
+    if kind == 2:
+        return Or(*[random_sentence(rng, depth - 1) for _ in range(rng.randint(1, 3))])
+    if kind == 3:
+        return Implication(random_sentence(rng, depth - 1), random_sentence(rng, depth - 1))
+    return Biconditional(random_sentence(rng, depth - 1), random_sentence(rng, depth - 1))
+
+
+def random_problems(seed, count):
+    """Returns count random (knowledge, query) pairs."""
+    rng = random.Random(seed)
+    return [(And(*[random_sentence(rng, 3) for _ in range(rng.randint(1, 3))]), random_sentence(rng, 2))
+            for _ in range(count)]
+
+
+def entails_by_evaluation(knowledge, query):
+    """Checks entailment by evaluating both sentences in every model, as a reference for the other checkers."""
+    names = sorted(set.union(knowledge.symbols(), query.symbols()))
+    for values in itertools.product([False, True], repeat=len(names)):
+        model = dict(zip(names, values))
+        if knowledge.evaluate(model) and not query.evaluate(model):
+            return False
+    return True
+
+
+def deep_sentence(depth):
+    """Returns a sentence over P, Q and R nested depth levels deep."""
+    P, Q, R = SYMBOLS[:3]
+    sentence = P
+    for i in range(depth):
+        sentence = [Not(sentence), Implication(Q, sentence), And(sentence, Or(R, Q)),
+                    Biconditional(sentence, Q)][i % 4]
+    return sentence
+
+
+class TestDPLL(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(1000):
+            count = rng.randint(1, 8)
+            clauses = [[rng.choice([-1, 1]) * rng.randint(1, count) for _ in range(rng.randint(1, 4))]
+                       for _ in range(rng.randint(0, 40))]
+            satisfiable = any(
+                all(any((literal > 0) == values[abs(literal) - 1] for literal in clause) for clause in clauses)
+                for values in itertools.product([False, True], repeat=count)
+            )
+            model = dpll_satisfiable(clauses)
+            self.assertEqual(model is not None, satisfiable, clauses)
+            if model is not None:
+                # Tautologies hold whatever the missing variables are
+                for clause in clauses:
+                    self.assertTrue(any(literal in model or -literal in clause for literal in clause), (clauses, model))
+
+    def test_leaves_clauses_unchanged(self):
+        clauses = [[1, 2, 3], [-1, -2], [-3, 2], [3, -2, 1]]
+        copied = [list(clause) for clause in clauses]
+        dpll_satisfiable(clauses)
+        self.assertEqual(clauses, copied)
+
+    def test_pure_literals(self):
+        self.assertTrue(dpll_satisfiable([[1, 2], [1, -2], [2, 3]]) >= {1, 3})
+
+    def test_implication_chain(self):
+        chain = [Symbol(f"p{i}") for i in range(3000)]
+        knowledge = And(chain[0], *[Implication(a, b) for a, b in zip(chain, chain[1:])])
+        self.assertTrue(dpll_check(knowledge, chain[-1]))
+        self.assertFalse(dpll_check(knowledge, Not(chain[-1])))
+
+    def test_top_level_connectives_need_no_variables(self):
+        P, Q = SYMBOLS[:2]
+        cnf = CNF()
+        cnf.add(And(Implication(P, Q), Biconditional(Q, Not(P))))
+        self.assertEqual(cnf.count, 2)
+        self.assertEqual(cnf.clauses, [[-1, 2], [-2, -1], [2, 1]])
+
+
+class TestCheckers(unittest.TestCase):
+
+    def test_random_sentences(self):
+        checkers = [model_check, dpll_check, compiled_model_check, truth_table_check,
+                    lambda knowledge, query: model_check_all(knowledge, [query])[0],
+                    lambda knowledge, query: KnowledgeBase(*knowledge.conjuncts).entails(query),
+                    lambda knowledge, query: KnowledgeBase(*knowledge.conjuncts).dpll_entails(query)]
+        for knowledge, query in random_problems(0, 500):
+            expected = entails_by_evaluation(knowledge, query)
+            for checker in checkers:
+                self.assertEqual(checker(knowledge, query), expected, (knowledge, query))
+
+    def test_deep_sentences(self):
+        P, Q, R = SYMBOLS[:3]
+        for depth in (200, 300):
+            knowledge = And(deep_sentence(depth), Q)
+            for query in (P, Not(P), R):
+                expected = dpll_check(knowledge, query)
+                self.assertEqual(compiled_model_check(knowledge, query), expected)
+                self.assertEqual(truth_table_check(knowledge, query), expected)
+                self.assertEqual(model_check_all(knowledge, [query]), [expected])
+
+
+    def test_parallel(self):
+        chain = [Symbol(f"p{i}") for i in range(20)]
+        knowledge = And(*[Implication(a, b) for a, b in zip(chain, chain[1:])], chain[0])
+        self.assertTrue(parallel_model_check(knowledge, chain[-1], workers=2, fixed_symbols=2))
+        self.assertFalse(parallel_model_check(knowledge, Not(chain[-1]), workers=2, fixed_symbols=2))
+
+
+class TestInterning(unittest.TestCase):
+
+    def test_simplify(self):
+        for knowledge, query in random_problems(2, 300):
+            for sentence in (knowledge, query):
+                simplified = simplify(sentence)
+                self.assertIs(simplify(sentence), simplified)
+                self.assertTrue(entails_by_evaluation(sentence, simplified))
+                self.assertTrue(entails_by_evaluation(simplified, sentence))
+
+    def test_interned_sentences_are_immutable(self):
+        P, Q, R = SYMBOLS[:3]
+        sentence = simplify(And(P, Q))
+        with self.assertRaises(TypeError):
+            sentence.add(R)
+        with self.assertRaises(AttributeError):
+            sentence.conjuncts = [P]
+        with self.assertRaises(AttributeError):
+            sentence.conjuncts.append(R)
+        self.assertIs(intern_sentence(And(P, Q)), sentence)
+        self.assertEqual(sentence, And(P, Q))
+        self.assertEqual(hash(sentence), hash(And(P, Q)))
+
+
+class TestHorn(unittest.TestCase):
+
+    def test_model_check_uses_forward_chaining(self):
+        # Far too many symbols to enumerate, so this only finishes if model_check chains forward
+        chain = [Symbol(f"p{i}") for i in range(100)]
+        knowledge = And(chain[0], *[Implication(a, b) for a, b in zip(chain, chain[1:])])
+        self.assertTrue(model_check(knowledge, chain[-1]))
+        self.assertTrue(model_check(knowledge, And(chain[10], chain[20])))
+        self.assertFalse(model_check(knowledge, Not(chain[50])))
+
+    def test_closure_is_computed_once(self):
+        P, Q, R = SYMBOLS[:3]
+        knowledge = And(Or(P, Q), Implication(P, R))
+        model_check_all(knowledge, [P, R])
+        simplified = simplify(knowledge)
+        self.assertIs(logic.horn_closures.get(simplified), False)
+        calls = []
+        original = logic.horn_clauses
+        logic.horn_clauses = lambda sentence: calls.append(sentence) or original(sentence)
+        try:
+            self.assertEqual(model_check_all(knowledge, [P, R]), [False, False])
+            self.assertFalse(model_check(knowledge, Q))
+        finally:
+            logic.horn_clauses = original
+        self.assertEqual(calls, [])
+
+    def test_random_horn_knowledge(self):
+        rng = random.Random(3)
+        for _ in range(300):
+            clauses = []
+            for _ in range(rng.randint(1, 6)):
+                premises = rng.sample(SYMBOLS, rng.randint(0, 2))
+                head = rng.choice(SYMBOLS + [None])
+                if not premises:
+                    clauses.append(head if head is not None else Or())
+                elif head is None:
+                    clauses.append(Not(And(*premises)))
+                else:
+                    clauses.append(Implication(And(*premises), head))
+            knowledge = And(*clauses)
+            for query in SYMBOLS[:3] + [Not(symbol) for symbol in SYMBOLS[:3]]:
+                self.assertEqual(model_check(knowledge, query), entails_by_evaluation(knowledge, query))
+
+
+class TestKnowledgeBase(unittest.TestCase):
+
+    def test_dpll_queries_leave_clauses_unchanged(self):
+        rng = random.Random(5)
+        for knowledge, _ in random_problems(5, 100):
+            knowledge = KnowledgeBase(*knowledge.conjuncts)
+            knowledge.dpll_entails(SYMBOLS[0])
+            cnf = knowledge.cnf
+            size = (len(cnf.clauses), cnf.count, len(cnf.variables), len(cnf.encoded))
+            for _ in range(10):
+                query = random_sentence(rng, 3)
+                self.assertEqual(knowledge.dpll_entails(query), entails_by_evaluation(knowledge, query))
+                self.assertEqual((len(cnf.clauses), cnf.count, len(cnf.variables), len(cnf.encoded)), size)
+
+
+if __name__ == "__main__":
+    unittest.main()